@@ -11,24 +11,113 @@ from werkzeug.utils import secure_filename
 import os
 import uuid
 import json
+import hashlib
 from datetime import datetime, timedelta
 import math
-import geopy.distance
-from sqlalchemy import func, and_, or_
+import threading
+import time
+import atexit
+import multiprocessing
+import functools
+from urllib.parse import urlencode
+from concurrent.futures import ProcessPoolExecutor
+import queue
+import heapq
+from collections import OrderedDict, deque
+import numpy as np
+from sqlalchemy import func, and_, or_, event, case, text, literal_column, literal, inspect
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.schema import CreateIndex
 import base64
 from io import BytesIO
-from PIL import Image
+from PIL import Image, ImageOps
 import io
+import re
+import sqlite3
+import geo_utils
 
 app = Flask(__name__)
 CORS(app)
 
 # Configuration
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///pothole_reporting.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///pothole_reporting.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+if os.environ.get('DB_POOL_SIZE'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.environ['DB_POOL_SIZE']),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_pre_ping': True
+    }
+app.config['SPATIAL_BACKEND'] = os.environ.get('SPATIAL_BACKEND', 'auto')  # auto, postgis or bbox
+app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'default')  # default or production
+app.config['SQLITE_PRAGMAS'] = {
+    'production': {
+        'journal_mode': 'WAL',  # readers no longer block behind writers
+        'synchronous': 'NORMAL',  # safe with WAL, fsync only at checkpoints
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,  # in KiB when negative
+        'busy_timeout': 5000,  # ms to wait for the write lock
+        'temp_store': 'MEMORY'
+    }
+}
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['ALLOWED_PHOTO_EXTENSIONS'] = {'jpg', 'jpeg', 'png', 'webp'}
+app.config['PHOTO_WORKERS'] = int(os.environ.get('PHOTO_WORKERS', 2))
+app.config['PHOTO_SIZES'] = {'medium': 1024, 'thumbnail': 256}  # longest side in pixels
+app.config['MAX_PHOTO_SIZE'] = 32 * 1024 * 1024  # per file, across all chunks
+app.config['MAX_PHOTO_PIXELS'] = 50 * 1000 * 1000
+app.config['UPLOAD_CHUNK_SIZE'] = 1024 * 1024  # suggested chunk size for clients
+app.config['UPLOAD_BUFFER_SIZE'] = 64 * 1024  # bytes held in memory while streaming a chunk
+app.config['UPLOAD_HEADER_PROBE_SIZE'] = 64 * 1024  # bytes before the first attempt to read image dimensions
+app.config['UPLOAD_HEADER_MAX_PROBE_SIZE'] = 1024 * 1024  # give up on finding the dimensions after this
+app.config['UPLOADS_ACCEL_REDIRECT'] = os.environ.get('UPLOADS_ACCEL_REDIRECT')  # e.g. /protected-uploads/ behind nginx
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '0') == '1'  # Apache/lighttpd offload
+app.config['UPLOADS_MAX_AGE'] = 365 * 24 * 60 * 60  # content-hashed files never change
+app.config['PHASH_BANDS'] = 8  # multi-index bands, matches within PHASH_BANDS - 1 bits are always found
+app.config['PHASH_MAX_DISTANCE'] = 6  # hamming distance for near-identical photos
+app.config['MAX_BATCH_REPORTS'] = 500
+app.config['CLUSTER_ZOOM_THRESHOLD'] = 15  # zoom levels below this get clusters instead of points
+app.config['CLUSTER_CACHE_SIZE'] = 50000  # cached (zoom, cell) entries
+app.config['CLUSTER_MAX_CELLS'] = 4096  # larger requests are clustered at a coarser zoom
+app.config['CLUSTER_CACHE_TTL'] = 300  # seconds; bounds staleness from writes by other processes
+app.config['TILE_CACHE_SIZE'] = 10000  # cached (z, x, y) tiles
+app.config['TILE_CACHE_TTL'] = 300  # seconds
+app.config['TILE_MAX_FEATURES'] = 5000  # highest priority issues kept per tile
+app.config['RESPONSE_CACHE_SIZE'] = 2000  # cached responses per process
+app.config['RESPONSE_CACHE_REGION_SIZE'] = 0.1  # degrees per version region
+# Optional SQLite file shared by all workers on the box; without it each process
+# keeps its own versions and only sees its own writes
+app.config['RESPONSE_CACHE_PATH'] = os.environ.get('RESPONSE_CACHE_PATH')
+app.config['RESPONSE_CACHE_SHARED_SIZE'] = 20000  # newest responses kept in the shared file
+# Seconds a cached response may live; bounds staleness from writes by other processes
+# when there is no shared file, and from time-dependent fields like the age bonus
+app.config['RESPONSE_CACHE_TTL'] = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+app.config['CHANGE_FEED_QUEUE_SIZE'] = 1000  # undelivered events per subscriber before it must resync
+app.config['CHANGE_FEED_HISTORY_SIZE'] = 5000  # recent events replayed to reconnecting clients
+app.config['CHANGE_FEED_HEARTBEAT'] = 15  # seconds between keep-alive comments
+app.config['UPVOTE_BUFFER_ENABLED'] = os.environ.get('UPVOTE_BUFFER_ENABLED', '0') == '1'
+app.config['UPVOTE_FLUSH_INTERVAL_MS'] = 200
+app.config['UPVOTE_FLUSH_MAX_ENTRIES'] = 500
+app.config['WORK_QUEUE_REGION_SIZE'] = 0.01  # degrees per region heap (~1.1 km)
+app.config['WORK_QUEUE_MAX_AGE'] = 300  # seconds between reloads from the database
+app.config['WORK_QUEUE_BATCH_RADIUS'] = 300  # meters between jobs batched together
+app.config['WORK_QUEUE_MAX_RADIUS'] = 50000  # meters
+app.config['WORK_QUEUE_MAX_JOBS'] = 200
+# With the scheduler disabled, age bonuses are refreshed once at startup and then
+# only by POST /api/admin/priorities/refresh, so they stop growing day by day;
+# call it from an external daily job, or priorities and age-based ordering go stale
+app.config['PRIORITY_SCHEDULER_ENABLED'] = os.environ.get('PRIORITY_SCHEDULER_ENABLED', '1') == '1'
+app.config['PRIORITY_REFRESH_INTERVAL'] = int(os.environ.get('PRIORITY_REFRESH_INTERVAL', 900))  # seconds
+app.config['PRIORITY_BATCH_SIZE'] = 500  # issues per bulk UPDATE
+app.config['PRIORITY_BATCH_PAUSE_MS'] = 50  # pause between batches to leave room for requests
+# Required in the X-Admin-Token header of admin endpoints, which are disabled while unset
+app.config['ADMIN_TOKEN'] = os.environ.get('ADMIN_TOKEN')
 
 # Create upload directory
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -36,6 +125,41 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 # Initialize database
 db = SQLAlchemy(app)
 
+@event.listens_for(Engine, 'connect')
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the configured SQLite tuning profile to every new pooled connection"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    
+    pragmas = app.config['SQLITE_PRAGMAS'].get(app.config['SQLITE_PROFILE'], {})
+    cursor = dbapi_connection.cursor()
+    for pragma, value in pragmas.items():
+        cursor.execute(f'PRAGMA {pragma} = {value}')
+    cursor.close()
+
+# SQL helpers
+class days_since(FunctionElement):
+    """Whole days elapsed since a UTC timestamp column, never negative"""
+    type = db.Integer()
+    name = 'days_since'
+    inherit_cache = True
+
+@compiles(days_since)
+def compile_days_since(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    return f"MAX(CAST(julianday('now') - julianday({column}) AS INTEGER), 0)"
+
+@compiles(days_since, 'postgresql')
+def compile_days_since_postgresql(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    return f"GREATEST(CAST(FLOOR(EXTRACT(EPOCH FROM (timezone('utc', now()) - {column})) / 86400) AS INTEGER), 0)"
+
+def dialect_insert(table):
+    """Return an INSERT construct supporting ON CONFLICT for the active database"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
 # Database Models
 class User(db.Model):
     __tablename__ = 'users'
@@ -66,6 +190,17 @@ class User(db.Model):
 
 class Issue(db.Model):
     __tablename__ = 'issues'
+    __table_args__ = (
+        # Duplicate detection: grid cells of one type reported recently
+        db.Index('ix_issues_grid_cell_type_created_at', 'grid_cell', 'type', 'created_at'),
+        db.Index('ix_issues_type_status_created_at', 'type', 'status', 'created_at'),
+        # Map, cluster and tile bounding boxes
+        db.Index('ix_issues_latitude_longitude_type_status', 'latitude', 'longitude', 'type', 'status'),
+        # Statistics rollup rebuilds and ward reports
+        db.Index('ix_issues_created_at_ward', 'created_at', 'ward'),
+        # Incremental priority refresh walks issues still gaining an age bonus
+        db.Index('ix_issues_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     type = db.Column(db.String(20), nullable=False)  # pothole, road_construction, road_closure
@@ -75,12 +210,15 @@ class Issue(db.Model):
     severity = db.Column(db.String(20), default='medium')  # low, medium, high, critical
     description = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(20), default='reported')  # reported, verified, repair_scheduled, fixed
-    priority = db.Column(db.Float, default=0.0)
+    base_priority = db.Column(db.Float, default=0.0)  # priority without the age bonus
+    age_bonus = db.Column(db.Float, default=0.0, nullable=False, index=True)  # kept current by PriorityScheduler
     upvotes = db.Column(db.Integer, default=0)
     road_type = db.Column(db.String(20), default='other')  # highway, main_road, residential, commercial, other
     ward = db.Column(db.String(100))
+    grid_cell = db.Column(db.String(32))  # spatial grid key, see SpatialGrid
     estimated_repair_time = db.Column(db.Integer)  # in days
     reporter_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    duplicate_of = db.Column(db.String(36), db.ForeignKey('issues.id'))  # flagged once its photo matched an older issue
     verified_by = db.Column(db.String(36), db.ForeignKey('users.id'))
     verified_at = db.Column(db.DateTime)
     fixed_at = db.Column(db.DateTime)
@@ -93,7 +231,22 @@ class Issue(db.Model):
     photos = db.relationship('Photo', backref='issue', lazy=True, cascade='all, delete-orphan')
     upvoters = db.relationship('User', secondary='issue_upvotes', backref='upvoted_issues')
 
-    def to_dict(self):
+    @hybrid_property
+    def priority(self):
+        """Current priority: the stored base plus the materialized age bonus"""
+        return round((self.base_priority or 0) + (self.age_bonus or 0), 1)
+
+    @priority.expression
+    def priority(cls):
+        return cls.base_priority + cls.age_bonus
+
+    def to_dict(self, photos=None, upvoter_ids=None):
+        """Serialize the issue; pass preloaded photos/upvoter_ids to avoid lazy loads"""
+        if photos is None:
+            photos = self.photos
+        if upvoter_ids is None:
+            upvoter_ids = [user.id for user in self.upvoters]
+        
         return {
             'id': self.id,
             'type': self.type,
@@ -111,86 +264,384 @@ class Issue(db.Model):
             'ward': self.ward,
             'estimated_repair_time': self.estimated_repair_time,
             'reporter_id': self.reporter_id,
+            'duplicate_of': self.duplicate_of,
             'verified_by': self.verified_by,
             'verified_at': self.verified_at.isoformat() if self.verified_at else None,
             'fixed_at': self.fixed_at.isoformat() if self.fixed_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'photos': [photo.to_dict() for photo in self.photos],
-            'upvoters': [user.id for user in self.upvoters]
+            'photos': [photo.to_dict() for photo in photos],
+            'upvoters': upvoter_ids
         }
 
+# Work lists and tiles ordered by priority
+db.Index('ix_issues_priority', Issue.base_priority + Issue.age_bonus)
+
 class Photo(db.Model):
     __tablename__ = 'photos'
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    issue_id = db.Column(db.String(36), db.ForeignKey('issues.id'), nullable=False)
+    issue_id = db.Column(db.String(36), db.ForeignKey('issues.id'), nullable=False, index=True)
     filename = db.Column(db.String(255), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
+    status = db.Column(db.String(20), default='ready')  # processing, ready, failed
+    content_hash = db.Column(db.String(64), index=True)  # sha256 of the uploaded bytes
+    phash = db.Column(db.String(16))  # 64-bit dHash as hex
+    medium_filename = db.Column(db.String(255))
+    thumbnail_filename = db.Column(db.String(255))
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def to_dict(self):
         return {
             'id': self.id,
-            'url': f'/uploads/{self.filename}',
+            # Files only exist once processing succeeded
+            'url': f'/uploads/{self.filename}' if self.status == 'ready' else None,
+            'medium_url': f'/uploads/{self.medium_filename}' if self.status == 'ready' and self.medium_filename else None,
+            'thumbnail_url': f'/uploads/{self.thumbnail_filename}' if self.status == 'ready' and self.thumbnail_filename else None,
             'filename': self.filename,
+            'status': self.status,
+            'content_hash': self.content_hash,
+            'phash': self.phash,
             'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None
         }
 
+# Multi-index hash table over perceptual hashes: each hash is split into bands
+class PhotoHashBand(db.Model):
+    __tablename__ = 'photo_hash_bands'
+    __table_args__ = (
+        db.Index('ix_photo_hash_bands_band_value', 'band', 'value'),
+    )
+    
+    photo_id = db.Column(db.String(36), db.ForeignKey('photos.id'), primary_key=True)
+    band = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.Integer, nullable=False)
+
+class UploadSession(db.Model):
+    __tablename__ = 'upload_sessions'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    issue_id = db.Column(db.String(36), db.ForeignKey('issues.id'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)  # as named by the client
+    total_size = db.Column(db.Integer, nullable=False)
+    received_size = db.Column(db.Integer, nullable=False, default=0)
+    image_format = db.Column(db.String(10))  # set once the header has been validated
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
+    status = db.Column(db.String(20), default='uploading')  # uploading, complete
+    photo_id = db.Column(db.String(36), db.ForeignKey('photos.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def part_path(self):
+        return os.path.join(app.config['UPLOAD_FOLDER'], f'{self.id}.part')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'issue_id': self.issue_id,
+            'filename': self.filename,
+            'total_size': self.total_size,
+            'received_size': self.received_size,
+            'image_format': self.image_format,
+            'width': self.width,
+            'height': self.height,
+            'status': self.status,
+            'photo_id': self.photo_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
 # Association table for issue upvotes
 issue_upvotes = db.Table('issue_upvotes',
     db.Column('issue_id', db.String(36), db.ForeignKey('issues.id'), primary_key=True),
-    db.Column('user_id', db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    db.Column('user_id', db.String(36), db.ForeignKey('users.id'), primary_key=True),
+    # The primary key covers lookups by issue, this covers lookups by user
+    db.Index('ix_issue_upvotes_user_id', 'user_id')
 )
 
+# Spatial Grid Index
+class SpatialGrid:
+    def __init__(self):
+        self.CELL_SIZE = 0.001  # degrees (~111m of latitude)
+
+    def cell_for(self, latitude, longitude):
+        """Return the key of the grid cell containing a point"""
+        row = math.floor(float(latitude) / self.CELL_SIZE)
+        col = math.floor(float(longitude) / self.CELL_SIZE)
+        return f'{row}:{col}'
+
+    def neighbouring_cells(self, latitude, longitude, radius):
+        """Return the keys of every cell that may hold points within radius meters"""
+        min_lat, max_lat, min_lng, max_lng = geo_utils.expand_bbox(float(latitude), float(longitude), radius)
+        
+        row_min = math.floor(min_lat / self.CELL_SIZE)
+        row_max = math.floor(max_lat / self.CELL_SIZE)
+        col_min = math.floor(min_lng / self.CELL_SIZE)
+        col_max = math.floor(max_lng / self.CELL_SIZE)
+        
+        return [
+            f'{row}:{col}'
+            for row in range(row_min, row_max + 1)
+            for col in range(col_min, col_max + 1)
+        ]
+
+# Incrementally maintained statistics, one row per (ward, day, type, severity, status)
+class IssueStatsRollup(db.Model):
+    __tablename__ = 'issue_stats_rollup'
+    __table_args__ = (
+        # The primary key serves per-ward queries, this serves city-wide ones
+        db.Index('ix_issue_stats_rollup_day', 'day'),
+    )
+    
+    ward = db.Column(db.String(100), primary_key=True)  # '' when the issue has no ward
+    day = db.Column(db.Date, primary_key=True)
+    type = db.Column(db.String(20), primary_key=True)
+    severity = db.Column(db.String(20), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    issue_count = db.Column(db.Integer, nullable=False, default=0)
+    base_priority_sum = db.Column(db.Float, nullable=False, default=0.0)
+    upvotes_sum = db.Column(db.Integer, nullable=False, default=0)
+    repair_time_sum = db.Column(db.Integer, nullable=False, default=0)
+
+# Spatial Query Strategies
+class BBoxSpatialStrategy:
+    """Plain float range comparisons and grid cells, works on any database"""
+    name = 'bbox'
+
+    def setup(self, connection):
+        pass
+
+    def within_bbox(self, min_lat, max_lat, min_lng, max_lng):
+        return [
+            Issue.latitude >= min_lat,
+            Issue.latitude <= max_lat,
+            Issue.longitude >= min_lng,
+            Issue.longitude <= max_lng
+        ]
+
+    def near_any(self, points, radius):
+        cells = set()
+        for latitude, longitude in points:
+            cells.update(spatial_grid.neighbouring_cells(latitude, longitude, radius))
+        return [Issue.grid_cell.in_(cells)]
+
+class PostGISSpatialStrategy:
+    """Generated geometry column with a GiST index on PostgreSQL/PostGIS"""
+    name = 'postgis'
+
+    def __init__(self):
+        self.geom = literal_column('issues.geom')
+
+    def setup(self, connection):
+        connection.execute(text('CREATE EXTENSION IF NOT EXISTS postgis'))
+        connection.execute(text(
+            'ALTER TABLE issues ADD COLUMN IF NOT EXISTS geom geometry(Point, 4326) '
+            'GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)) STORED'
+        ))
+        connection.execute(text('CREATE INDEX IF NOT EXISTS ix_issues_geom ON issues USING GIST (geom)'))
+
+    def within_bbox(self, min_lat, max_lat, min_lng, max_lng):
+        envelope = func.ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326)
+        return [self.geom.op('&&')(envelope)]
+
+    def near_any(self, points, radius):
+        return [or_(*[
+            func.ST_DWithin(
+                func.geography(self.geom),
+                func.geography(func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326)),
+                radius
+            )
+            for latitude, longitude in points
+        ])]
+
+class SpatialIndex:
+    def __init__(self, backend):
+        self.BACKEND = backend
+        self.strategy = None
+
+    def resolve(self):
+        """Pick the spatial strategy for the configured backend and database"""
+        if self.strategy is None:
+            self.strategy = self.choose_strategy(db.engine)
+        return self.strategy
+
+    def choose_strategy(self, engine):
+        if self.BACKEND == 'bbox':
+            return BBoxSpatialStrategy()
+        if self.BACKEND == 'postgis':
+            return PostGISSpatialStrategy()
+        
+        # auto: use PostGIS only when it is installed; creating it needs superuser rights
+        if engine.dialect.name != 'postgresql':
+            return BBoxSpatialStrategy()
+        with engine.connect() as connection:
+            installed = connection.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'postgis'")
+            ).first()
+        return PostGISSpatialStrategy() if installed else BBoxSpatialStrategy()
+
+    def setup(self):
+        """Create backend specific columns and indexes"""
+        with db.engine.begin() as connection:
+            self.resolve().setup(connection)
+
+    def within_bbox(self, min_lat, max_lat, min_lng, max_lng):
+        """Conditions selecting issues inside a bounding box"""
+        return self.resolve().within_bbox(min_lat, max_lat, min_lng, max_lng)
+
+    def near_any(self, points, radius):
+        """Conditions selecting issues within radius meters of any (lat, lng) point"""
+        return self.resolve().near_any(points, radius)
+
 # Duplicate Detection Algorithm
 class DuplicateDetector:
     def __init__(self):
         self.DISTANCE_THRESHOLD = 50  # meters
         self.TIME_THRESHOLD = 7  # days
         self.SIMILARITY_THRESHOLD = 0.7
+        self.PHOTO_MATCH_BONUS = 0.2  # added when a report's photo_hash matches a candidate's photo
 
     def find_potential_duplicates(self, new_issue):
         """Find potential duplicate issues"""
+        candidates = self.fetch_candidates([new_issue])
+        return self.rank_candidates(new_issue, self.index_candidates(candidates))
+
+    def fetch_candidates(self, new_issues):
+        """Load every recent open issue that could duplicate any of the given reports"""
         time_threshold = datetime.utcnow() - timedelta(days=self.TIME_THRESHOLD)
         
-        # Find issues within time threshold and same type
-        nearby_issues = Issue.query.filter(
+        # Only look near the reports, using the configured spatial strategy
+        points = [(float(new_issue['latitude']), float(new_issue['longitude'])) for new_issue in new_issues]
+        types = {new_issue['type'] for new_issue in new_issues}
+        
+        # Find nearby issues within time threshold and same type
+        return Issue.query.filter(
             and_(
-                Issue.type == new_issue['type'],
+                *spatial_index.near_any(points, self.DISTANCE_THRESHOLD),
+                Issue.type.in_(types),
                 Issue.created_at >= time_threshold,
                 Issue.status.in_(['reported', 'verified'])
             )
         ).all()
 
+    def index_candidates(self, candidates):
+        """Group candidate issues by (type, grid cell)"""
+        candidate_index = {}
+        for issue in candidates:
+            candidate_index.setdefault((issue.type, issue.grid_cell), []).append(issue)
+        return candidate_index
+
+    def rank_candidates(self, new_issue, candidate_index):
+        """Score the indexed candidates near a report, best match first"""
+        cells = spatial_grid.neighbouring_cells(
+            new_issue['latitude'], new_issue['longitude'], self.DISTANCE_THRESHOLD
+        )
+        nearby_issues = [
+            issue
+            for cell in cells
+            for issue in candidate_index.get((new_issue['type'], cell), [])
+        ]
+
         potential_duplicates = []
+        if not nearby_issues:
+            return potential_duplicates
+        
+        # Score all candidates in one vectorized pass
+        distances, similarity_scores = self.score_candidates(new_issue, nearby_issues)
         
-        for existing_issue in nearby_issues:
-            # Calculate distance
-            distance = self.calculate_distance(
-                new_issue['latitude'], new_issue['longitude'],
-                existing_issue.latitude, existing_issue.longitude
+        # Near-identical photos are a strong extra hint that two reports show the same spot
+        if new_issue.get('photo_hash') and not photo_hash_index.is_flat(new_issue['photo_hash']):
+            photo_matches = photo_hash_index.find(
+                new_issue['photo_hash'], issue_ids=[issue.id for issue in nearby_issues]
             )
-            
+            photo_bonus = np.array([issue.id in photo_matches for issue in nearby_issues]) * self.PHOTO_MATCH_BONUS
+            similarity_scores = np.minimum(similarity_scores + photo_bonus, 1.0)
+        
+        for existing_issue, distance, similarity_score in zip(nearby_issues, distances, similarity_scores):
             if distance <= self.DISTANCE_THRESHOLD:
-                similarity_score = self.calculate_similarity(new_issue, existing_issue, distance)
-                
                 potential_duplicates.append({
                     'issue': existing_issue,
-                    'distance': distance,
-                    'similarity_score': similarity_score,
-                    'is_duplicate': similarity_score > self.SIMILARITY_THRESHOLD
+                    'distance': float(distance),
+                    'similarity_score': float(similarity_score),
+                    'is_duplicate': bool(similarity_score > self.SIMILARITY_THRESHOLD)
                 })
         
         # Sort by similarity score
         potential_duplicates.sort(key=lambda x: x['similarity_score'], reverse=True)
         return potential_duplicates
 
+    def find_photo_duplicate(self, issue, phash):
+        """Re-check an issue once its photo is hashed, returning the older issue it duplicates"""
+        report = {
+            'type': issue.type,
+            'latitude': issue.latitude,
+            'longitude': issue.longitude,
+            'severity': issue.severity,
+            'description': issue.description,
+            'photo_hash': phash
+        }
+        candidates = [
+            candidate for candidate in self.fetch_candidates([report])
+            if candidate.id != issue.id and candidate.created_at <= issue.created_at
+        ]
+        potential_duplicates = self.rank_candidates(report, self.index_candidates(candidates))
+        return next((dup['issue'] for dup in potential_duplicates if dup['is_duplicate']), None)
+
     def calculate_distance(self, lat1, lon1, lat2, lon2):
         """Calculate distance between two points in meters"""
-        point1 = (lat1, lon1)
-        point2 = (lat2, lon2)
-        return geopy.distance.distance(point1, point2).meters
+        return geo_utils.haversine(lat1, lon1, lat2, lon2)
+
+    def score_candidates(self, new_issue, candidates):
+        """Calculate distances and similarity scores for a list of candidate issues"""
+        latitudes = np.array([issue.latitude for issue in candidates], dtype=float)
+        longitudes = np.array([issue.longitude for issue in candidates], dtype=float)
+        severities = np.array([issue.severity for issue in candidates], dtype=object)
+        created_ats = np.array([issue.created_at for issue in candidates], dtype='datetime64[us]')
+        descriptions = [issue.description for issue in candidates]
+        
+        distances = self.calculate_distances(
+            new_issue['latitude'], new_issue['longitude'], latitudes, longitudes
+        )
+        similarity_scores = self.calculate_similarities(
+            new_issue, distances, severities, created_ats, descriptions
+        )
+        return distances, similarity_scores
+
+    def calculate_distances(self, lat, lon, latitudes, longitudes):
+        """Calculate distances in meters from one point to arrays of nearby points.
+
+        Candidates come from the neighbouring grid cells, so the local
+        equirectangular approximation is exact to well under a centimeter.
+        """
+        meters_per_lat, meters_per_lng = geo_utils.meters_per_degree(float(lat))
+        return np.hypot(
+            (latitudes - float(lat)) * meters_per_lat,
+            (longitudes - float(lon)) * meters_per_lng
+        )
+
+    def calculate_similarities(self, new_issue, distances, severities, created_ats, descriptions):
+        """Calculate similarity scores for arrays of candidates, matching calculate_similarity"""
+        # Distance factor (closer = higher score)
+        distance_scores = np.maximum(0, (self.DISTANCE_THRESHOLD - distances) / self.DISTANCE_THRESHOLD)
+        scores = distance_scores * 0.4  # 40% weight
+        
+        # Severity match
+        scores += (severities == new_issue['severity']) * 0.3  # 30% weight
+        
+        # Time proximity
+        time_diffs = np.abs((np.datetime64(datetime.utcnow(), 'us') - created_ats) / np.timedelta64(1, 's'))
+        max_time_diff = self.TIME_THRESHOLD * 24 * 60 * 60
+        time_scores = np.maximum(0, (max_time_diff - time_diffs) / max_time_diff)
+        scores += time_scores * 0.2  # 20% weight
+        
+        # Description similarity (basic keyword matching)
+        description_scores = np.array([
+            self.calculate_description_similarity(new_issue['description'], description)
+            for description in descriptions
+        ], dtype=float)
+        scores += description_scores * 0.1  # 10% weight
+        
+        return np.minimum(scores, 1.0)
 
     def calculate_similarity(self, new_issue, existing_issue, distance):
         """Calculate similarity score between issues"""
@@ -250,29 +701,1644 @@ class PriorityCalculator:
             'residential': 1,
             'other': 1
         }
+        self.UPVOTE_WEIGHT = 0.5  # points per upvote
+        self.AGE_WEIGHT = 0.1  # points per day since reported
+        self.AGE_CAP = 2  # maximum age bonus
 
-    def calculate_priority(self, issue):
-        """Calculate priority score for an issue"""
+    def calculate_base_priority(self, issue):
+        """Calculate the stored, time-independent part of an issue's priority"""
         score = 0
         
         # Base severity score
         score += self.severity_scores.get(issue.severity, 2)
         
         # Upvotes boost
-        score += issue.upvotes * 0.5
+        score += (issue.upvotes or 0) * self.UPVOTE_WEIGHT
         
         # Road type importance
         score += self.road_type_scores.get(issue.road_type, 1)
         
-        # Age factor (older issues get higher priority)
-        days_since_reported = (datetime.utcnow() - issue.created_at).days
-        score += min(days_since_reported * 0.1, 2)  # Cap at 2 points
+        return score
+
+    def base_priority_expression(self, issue_class):
+        """SQL expression equivalent of calculate_base_priority"""
+        return (
+            case(self.severity_scores, value=issue_class.severity, else_=2)
+            + func.coalesce(issue_class.upvotes, 0) * self.UPVOTE_WEIGHT
+            + case(self.road_type_scores, value=issue_class.road_type, else_=1)
+        )
+
+    def calculate_age_bonus(self, created_at):
+        """Age factor (older issues get higher priority)"""
+        if not created_at:
+            return 0
+        
+        days_since_reported = max((datetime.utcnow() - created_at).days, 0)
+        return min(days_since_reported * self.AGE_WEIGHT, self.AGE_CAP)
+
+    def age_bonus_expression(self, created_at_column):
+        """SQL expression equivalent of calculate_age_bonus"""
+        days_since_reported = days_since(created_at_column)
+        return case(
+            (days_since_reported * self.AGE_WEIGHT >= self.AGE_CAP, self.AGE_CAP),
+            else_=days_since_reported * self.AGE_WEIGHT
+        )
+
+# Statistics Rollup
+class StatsRollup:
+    def __init__(self):
+        self.MEASURES = ['issue_count', 'base_priority_sum', 'upvotes_sum', 'repair_time_sum']
+
+    def snapshot(self, issue):
+        """Capture the rollup key and measures an issue currently contributes"""
+        key = (
+            issue.ward or '',
+            (issue.created_at or datetime.utcnow()).date(),
+            issue.type,
+            issue.severity or 'medium',
+            issue.status or 'reported'
+        )
+        measures = (1, issue.base_priority or 0, issue.upvotes or 0, issue.estimated_repair_time or 0)
+        return key, measures
+
+    def record(self, before, after):
+        """Apply the difference between two snapshots to the rollup table"""
+        deltas = {}
+        if before:
+            self.accumulate(deltas, before, -1)
+        if after:
+            self.accumulate(deltas, after, 1)
+        self.apply(deltas)
+
+    def accumulate(self, deltas, snapshot, sign):
+        """Add a snapshot's measures, times sign, to a dict of per-key deltas"""
+        key, measures = snapshot
+        current = deltas.get(key, [0] * len(measures))
+        deltas[key] = [delta + sign * value for delta, value in zip(current, measures)]
+
+    def apply(self, deltas):
+        """Upsert per-key deltas into the rollup table"""
+        rows = [
+            dict(zip(['ward', 'day', 'type', 'severity', 'status'], key), **dict(zip(self.MEASURES, delta)))
+            for key, delta in deltas.items()
+            if any(delta)
+        ]
+        if not rows:
+            return
+        
+        # Atomic upsert, so concurrent writers never race on creating a rollup row
+        table = IssueStatsRollup.__table__
+        statement = dialect_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[column.name for column in table.primary_key],
+            set_={
+                measure: table.c[measure] + statement.excluded[measure]
+                for measure in self.MEASURES
+            }
+        )
+        db.session.execute(statement, rows)
+
+    def rebuild(self):
+        """Recompute the whole rollup table from the issues table"""
+        deltas = {}
+        for issue in Issue.query.yield_per(1000):
+            self.accumulate(deltas, self.snapshot(issue), 1)
+        
+        db.session.query(IssueStatsRollup).delete()
+        self.apply(deltas)
+
+    def summarize(self, time_threshold, ward=None):
+        """Build the /api/issues/stats payload from rollup rows"""
+        query = db.session.query(
+            IssueStatsRollup.day,
+            IssueStatsRollup.type,
+            IssueStatsRollup.severity,
+            IssueStatsRollup.status,
+            *[func.sum(getattr(IssueStatsRollup, measure)) for measure in self.MEASURES]
+        ).filter(
+            IssueStatsRollup.day >= time_threshold.date(),
+            IssueStatsRollup.issue_count > 0
+        )
+        if ward:
+            query = query.filter(IssueStatsRollup.ward == ward)
+        
+        rows = query.group_by(
+            IssueStatsRollup.day,
+            IssueStatsRollup.type,
+            IssueStatsRollup.severity,
+            IssueStatsRollup.status
+        ).all()
+        
+        total_issues = 0
+        priority_sum = 0
+        upvotes_sum = 0
+        repair_time_sum = 0
+        type_breakdown = {}
+        severity_breakdown = {}
+        status_breakdown = {}
+        today = datetime.utcnow().date()
+        
+        for day, issue_type, severity, status, count, base_priority, upvotes, repair_time in rows:
+            if not count:
+                continue
+            
+            # The age bonus is evaluated per day bucket rather than per issue
+            days_old = (today - day).days
+            age_bonus = min(max(days_old, 0) * priority_calculator.AGE_WEIGHT, priority_calculator.AGE_CAP)
+            
+            total_issues += count
+            priority_sum += base_priority + age_bonus * count
+            upvotes_sum += upvotes
+            repair_time_sum += repair_time
+            type_breakdown[issue_type] = type_breakdown.get(issue_type, 0) + count
+            severity_breakdown[severity] = severity_breakdown.get(severity, 0) + count
+            status_breakdown[status] = status_breakdown.get(status, 0) + count
+        
+        if not total_issues:
+            return {
+                'totalIssues': 0,
+                'avgPriority': 0,
+                'avgUpvotes': 0,
+                'avgRepairTime': 0,
+                'typeBreakdown': {},
+                'severityBreakdown': {},
+                'statusBreakdown': {}
+            }
+        
+        return {
+            'totalIssues': total_issues,
+            'avgPriority': round(priority_sum / total_issues, 1),
+            'avgUpvotes': round(upvotes_sum / total_issues, 1),
+            'avgRepairTime': round(repair_time_sum / total_issues, 1),
+            'typeBreakdown': type_breakdown,
+            'severityBreakdown': severity_breakdown,
+            'statusBreakdown': status_breakdown
+        }
+
+# Cache Invalidation Log
+class InvalidationLog:
+    """Recently invalidated points, numbered by generation.
+
+    A cache reads the database outside its lock, so an invalidation can land
+    between the read and the store. Readers note the generation before the
+    read and skip storing entries for any cell invalidated since. Not thread
+    safe by itself: callers hold their own cache lock.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.MAX_ENTRIES = max_entries
+        self.generation = 0
+        self.points = deque(maxlen=max_entries)  # (generation, latitude, longitude)
+
+    def record(self, latitude, longitude):
+        self.generation += 1
+        self.points.append((self.generation, latitude, longitude))
+
+    def since(self, generation):
+        """Points invalidated after a generation, or None once the log no longer reaches back that far"""
+        if self.points and self.points[0][0] > generation + 1:
+            return None
+        points = []
+        for point_generation, latitude, longitude in reversed(self.points):
+            if point_generation <= generation:
+                break
+            points.append((latitude, longitude))
+        return points
+
+# Server-side Map Clustering
+class MapClusterer:
+    def __init__(self, max_entries, max_cells, ttl):
+        self.CELLS_PER_TILE = 4  # cluster cells along each side of a web-mercator tile
+        self.MAX_ENTRIES = max_entries
+        self.MAX_CELLS = max_cells
+        self.TTL = ttl  # seconds
+        self.severity_levels = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
+        self.cache = OrderedDict()  # (zoom, cell) -> {filters_key: (cluster or None, stored_at)}
+        self.invalidations = InvalidationLog()
+        self.lock = threading.Lock()
+
+    def cell_size(self, zoom):
+        """Cluster cell size in degrees for a zoom level"""
+        return 360 / (2 ** zoom) / self.CELLS_PER_TILE
+
+    def cell_for(self, latitude, longitude, zoom):
+        """Return the (row, col) cluster cell containing a point"""
+        size = self.cell_size(zoom)
+        return math.floor((latitude + 90) / size), math.floor((longitude + 180) / size)
+
+    def effective_zoom(self, zoom, min_lat, max_lat, min_lng, max_lng):
+        """Coarsen the zoom until the bounding box covers at most MAX_CELLS cells"""
+        while zoom > 0:
+            row_min, col_min = self.cell_for(min_lat, min_lng, zoom)
+            row_max, col_max = self.cell_for(max_lat, max_lng, zoom)
+            if (row_max - row_min + 1) * (col_max - col_min + 1) <= self.MAX_CELLS:
+                break
+            zoom -= 1
+        return zoom
+
+    def get_clusters(self, zoom, min_lat, max_lat, min_lng, max_lng, types, statuses):
+        """Return clusters for every cell intersecting the bounding box"""
+        min_lat, max_lat = max(min_lat, -90), min(max_lat, 90)
+        min_lng, max_lng = max(min_lng, -180), min(max_lng, 180)
+        zoom = self.effective_zoom(zoom, min_lat, max_lat, min_lng, max_lng)
+        
+        filters_key = (tuple(sorted(types)), tuple(sorted(statuses)))
+        row_min, col_min = self.cell_for(min_lat, min_lng, zoom)
+        row_max, col_max = self.cell_for(max_lat, max_lng, zoom)
+        cells = [
+            (row, col)
+            for row in range(row_min, row_max + 1)
+            for col in range(col_min, col_max + 1)
+        ]
+        
+        now = time.monotonic()
+        with self.lock:
+            cached = {}
+            for cell in cells:
+                entry = self.cache.get((zoom, cell))
+                if entry is not None and filters_key in entry:
+                    cluster, stored_at = entry[filters_key]
+                    if now - stored_at <= self.TTL:
+                        self.cache.move_to_end((zoom, cell))
+                        cached[cell] = cluster
+            generation = self.invalidations.generation
+        
+        if len(cached) < len(cells):
+            computed = self.aggregate(zoom, row_min, row_max, col_min, col_max, types, statuses)
+            with self.lock:
+                # Cells written to while aggregating are returned but not cached
+                points = self.invalidations.since(generation)
+                stale_cells = None if points is None else {
+                    self.cell_for(latitude, longitude, zoom) for latitude, longitude in points
+                }
+                for cell in cells:
+                    cluster = computed.get(cell)
+                    cached[cell] = cluster
+                    if stale_cells is not None and cell not in stale_cells:
+                        self.cache.setdefault((zoom, cell), {})[filters_key] = (cluster, now)
+                        self.cache.move_to_end((zoom, cell))
+                while len(self.cache) > self.MAX_ENTRIES:
+                    self.cache.popitem(last=False)
+        
+        return zoom, [cached[cell] for cell in cells if cached[cell]]
+
+    def aggregate(self, zoom, row_min, row_max, col_min, col_max, types, statuses):
+        """Aggregate issues per cluster cell in SQL over whole cells of the range"""
+        size = self.cell_size(zoom)
+        
+        # Coordinates are shifted to be positive so that CAST truncation equals floor
+        row = db.cast((Issue.latitude + 90) / size, db.Integer)
+        col = db.cast((Issue.longitude + 180) / size, db.Integer)
+        severity_level = case(
+            *[(Issue.severity == severity, level) for severity, level in self.severity_levels.items()],
+            else_=2
+        )
+        
+        statement = db.select(
+            row, col, Issue.status,
+            func.count(), func.sum(Issue.latitude), func.sum(Issue.longitude), func.max(severity_level)
+        ).where(
+            Issue.latitude >= row_min * size - 90,
+            Issue.latitude < (row_max + 1) * size - 90,
+            Issue.longitude >= col_min * size - 180,
+            Issue.longitude < (col_max + 1) * size - 180
+        )
+        if types:
+            statement = statement.where(Issue.type.in_(types))
+        if statuses:
+            statement = statement.where(Issue.status.in_(statuses))
+        statement = statement.group_by(row, col, Issue.status)
+        
+        severity_names = {level: severity for severity, level in self.severity_levels.items()}
+        sums = {}
+        for cell_row, cell_col, status, count, lat_sum, lng_sum, max_level in db.session.execute(statement):
+            entry = sums.setdefault((cell_row, cell_col), {
+                'count': 0, 'lat_sum': 0.0, 'lng_sum': 0.0, 'max_level': 0, 'statuses': {}
+            })
+            entry['count'] += count
+            entry['lat_sum'] += lat_sum
+            entry['lng_sum'] += lng_sum
+            entry['max_level'] = max(entry['max_level'], max_level)
+            entry['statuses'][status] = entry['statuses'].get(status, 0) + count
+        
+        return {
+            cell: {
+                'cell': f'{zoom}/{cell[0]}/{cell[1]}',
+                'count': entry['count'],
+                'latitude': entry['lat_sum'] / entry['count'],
+                'longitude': entry['lng_sum'] / entry['count'],
+                'maxSeverity': severity_names.get(entry['max_level'], 'medium'),
+                'statuses': entry['statuses']
+            }
+            for cell, entry in sums.items()
+        }
+
+    def invalidate(self, latitude, longitude):
+        """Drop every cached cluster containing a point, for all zoom levels and filters"""
+        with self.lock:
+            zooms = {zoom for zoom, _ in self.cache}
+            for zoom in zooms:
+                self.cache.pop((zoom, self.cell_for(latitude, longitude, zoom)), None)
+            self.invalidations.record(latitude, longitude)
+
+# Issue Tiles
+class TileRenderer:
+    """Renders web-mercator tiles of issues as compact JSON.
+
+    Tile format: {"z", "x", "y", "extent", "fields", "columns"} where columns
+    holds one array per field. "px" and "py" are integer positions inside the
+    tile on a 0..extent grid (origin top-left, as in Mapbox Vector Tiles).
+    """
+
+    def __init__(self, max_entries, max_features, ttl):
+        self.EXTENT = 4096
+        self.MAX_ZOOM = 22
+        self.MAX_ENTRIES = max_entries
+        self.MAX_FEATURES = max_features
+        self.TTL = ttl  # seconds
+        self.FIELDS = ['id', 'px', 'py', 'type', 'severity', 'status', 'upvotes', 'priority']
+        self.cache = OrderedDict()  # (z, x, y) -> {filters_key: ((body, etag), stored_at)}
+        self.invalidations = InvalidationLog()
+        self.lock = threading.Lock()
+
+    def is_valid_tile(self, z, x, y):
+        """Check that tile coordinates exist at their zoom level"""
+        return 0 <= z <= self.MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+    def project(self, latitude, longitude, z):
+        """Project a point to fractional tile coordinates at a zoom level"""
+        n = 2 ** z
+        lat = math.radians(max(min(latitude, 85.0511), -85.0511))
+        x = (longitude + 180) / 360 * n
+        y = (1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n
+        return x, y
+
+    def tile_bounds(self, z, x, y):
+        """Return (min_lat, max_lat, min_lng, max_lng) of a tile"""
+        n = 2 ** z
+        min_lng = x / n * 360 - 180
+        max_lng = (x + 1) / n * 360 - 180
+        max_lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+        min_lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+        return min_lat, max_lat, min_lng, max_lng
+
+    def get_tile(self, z, x, y, types, statuses):
+        """Return the encoded tile body and its ETag, rendering it on a cache miss"""
+        filters_key = (tuple(sorted(types)), tuple(sorted(statuses)))
+        
+        now = time.monotonic()
+        with self.lock:
+            entry = self.cache.get((z, x, y))
+            if entry is not None and filters_key in entry:
+                tile, stored_at = entry[filters_key]
+                if now - stored_at <= self.TTL:
+                    self.cache.move_to_end((z, x, y))
+                    return tile
+            generation = self.invalidations.generation
+        
+        body = self.render(z, x, y, types, statuses)
+        tile = (body, hashlib.sha1(body).hexdigest())
+        
+        with self.lock:
+            # A tile written to while rendering is served once but not cached
+            points = self.invalidations.since(generation)
+            stale = points is None or any(
+                tuple(int(coordinate) for coordinate in self.project(latitude, longitude, z)) == (x, y)
+                for latitude, longitude in points
+            )
+            if not stale:
+                self.cache.setdefault((z, x, y), {})[filters_key] = (tile, now)
+                self.cache.move_to_end((z, x, y))
+                while len(self.cache) > self.MAX_ENTRIES:
+                    self.cache.popitem(last=False)
+        
+        return tile
+
+    def render(self, z, x, y, types, statuses):
+        """Encode the issues inside a tile"""
+        min_lat, max_lat, min_lng, max_lng = self.tile_bounds(z, x, y)
+        
+        statement = db.select(
+            Issue.id, Issue.latitude, Issue.longitude, Issue.type,
+            Issue.severity, Issue.status, Issue.upvotes, Issue.priority.label('priority')
+        ).where(
+            Issue.latitude >= min_lat,
+            Issue.latitude < max_lat,
+            Issue.longitude >= min_lng,
+            Issue.longitude < max_lng
+        )
+        if types:
+            statement = statement.where(Issue.type.in_(types))
+        if statuses:
+            statement = statement.where(Issue.status.in_(statuses))
+        statement = statement.order_by(Issue.priority.desc()).limit(self.MAX_FEATURES)
+        
+        columns = {field: [] for field in self.FIELDS}
+        for issue_id, latitude, longitude, issue_type, severity, status, upvotes, priority in db.session.execute(statement):
+            tile_x, tile_y = self.project(latitude, longitude, z)
+            columns['id'].append(issue_id)
+            columns['px'].append(min(int((tile_x - x) * self.EXTENT), self.EXTENT - 1))
+            columns['py'].append(min(int((tile_y - y) * self.EXTENT), self.EXTENT - 1))
+            columns['type'].append(issue_type)
+            columns['severity'].append(severity)
+            columns['status'].append(status)
+            columns['upvotes'].append(upvotes)
+            columns['priority'].append(round(priority, 1))
+        
+        tile = {
+            'z': z,
+            'x': x,
+            'y': y,
+            'extent': self.EXTENT,
+            'fields': self.FIELDS,
+            'columns': columns
+        }
+        return json.dumps(tile, separators=(',', ':')).encode('utf-8')
+
+    def invalidate(self, latitude, longitude):
+        """Drop every cached tile containing a point, for all zoom levels and filters"""
+        with self.lock:
+            zooms = {z for z, _, _ in self.cache}
+            for z in zooms:
+                tile_x, tile_y = self.project(latitude, longitude, z)
+                self.cache.pop((z, int(tile_x), int(tile_y)), None)
+            self.invalidations.record(latitude, longitude)
+
+# Write-coalescing Upvote Buffer
+class UpvoteBuffer:
+    def __init__(self, enabled, flush_interval_ms, max_entries):
+        self.enabled = enabled
+        self.FLUSH_INTERVAL = flush_interval_ms / 1000
+        self.MAX_ENTRIES = max_entries
+        self.pending = OrderedDict()  # (issue_id, user_id) -> accepted at
+        self.in_flight = OrderedDict()  # entries being written by the current flush
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.flush_requested = threading.Event()
+        self.flusher = None
+
+    def add(self, issue_id, user_id):
+        """Accept an upvote into the buffer, returning False if it is already pending"""
+        key = (issue_id, user_id)
+        with self.lock:
+            if key in self.pending or key in self.in_flight:
+                return False
+            self.pending[key] = datetime.utcnow()
+            if len(self.pending) >= self.MAX_ENTRIES:
+                self.flush_requested.set()
+            if self.flusher is None:
+                self.flusher = threading.Thread(target=self.run, daemon=True)
+                self.flusher.start()
+        return True
+
+    def pending_upvoters(self, issue_id):
+        """Return user ids whose upvotes on an issue are not yet written"""
+        with self.lock:
+            return [
+                user_id
+                for entries in (self.in_flight, self.pending)
+                for pending_issue_id, user_id in entries
+                if pending_issue_id == issue_id
+            ]
+
+    def has_pending(self, issue_id, user_id):
+        """Check whether a user's upvote on an issue is waiting to be written"""
+        with self.lock:
+            return (issue_id, user_id) in self.pending or (issue_id, user_id) in self.in_flight
+
+    def overlay(self, issue_dict):
+        """Merge pending upvotes into a serialized issue so voters see them immediately"""
+        if not self.pending and not self.in_flight:
+            return issue_dict
+        
+        pending_upvoters = self.pending_upvoters(issue_dict['id'])
+        if pending_upvoters:
+            issue_dict['upvotes'] += len(pending_upvoters)
+            issue_dict['priority'] = round(
+                issue_dict['priority'] + len(pending_upvoters) * priority_calculator.UPVOTE_WEIGHT, 1
+            )
+            issue_dict['upvoters'] = issue_dict.get('upvoters', []) + pending_upvoters
+        return issue_dict
+
+    def run(self):
+        """Flush every FLUSH_INTERVAL, or sooner once MAX_ENTRIES votes are waiting"""
+        while True:
+            self.flush_requested.wait(self.FLUSH_INTERVAL)
+            self.flush_requested.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                app.logger.error(f'Upvote buffer flush failed: {e}')
+
+    def flush(self):
+        """Write all pending upvotes in a single transaction"""
+        with self.flush_lock:
+            with self.lock:
+                if not self.pending:
+                    return
+                self.in_flight.update(self.pending)
+                self.pending.clear()
+                votes = list(self.in_flight)
+            
+            try:
+                with app.app_context():
+                    touched_issues = self.write(votes)
+            except Exception:
+                # Put the votes back so the next flush retries them
+                with self.lock:
+                    self.in_flight.update(self.pending)
+                    self.pending = self.in_flight
+                    self.in_flight = OrderedDict()
+                raise
+            
+            with self.lock:
+                self.in_flight.clear()
+            
+            for issue_id, latitude, longitude in touched_issues:
+                notify_issue_changed(issue_id, latitude, longitude)
+
+    def write(self, votes):
+        """Insert the votes and apply per-issue and per-user counter deltas"""
+        issue_ids = {issue_id for issue_id, _ in votes}
+        user_ids = {user_id for _, user_id in votes}
+        issues = {issue.id: issue for issue in Issue.query.filter(Issue.id.in_(issue_ids))}
+        known_users = {
+            user_id for user_id, in db.session.query(User.id).filter(User.id.in_(user_ids))
+        }
+        
+        votes_per_issue = {}
+        votes_per_user = {}
+        for issue_id, user_id in votes:
+            if issue_id not in issues or user_id not in known_users:
+                continue
+            vote_insert = db.session.execute(
+                dialect_insert(issue_upvotes)
+                .values(issue_id=issue_id, user_id=user_id)
+                .on_conflict_do_nothing()
+            )
+            if vote_insert.rowcount:
+                votes_per_issue[issue_id] = votes_per_issue.get(issue_id, 0) + 1
+                votes_per_user[user_id] = votes_per_user.get(user_id, 0) + 1
+        
+        # One counter and priority update per affected issue
+        rollup_deltas = {}
+        for issue_id, count in votes_per_issue.items():
+            db.session.execute(
+                db.update(Issue)
+                .where(Issue.id == issue_id)
+                .values(
+                    upvotes=Issue.upvotes + count,
+                    base_priority=Issue.base_priority + count * priority_calculator.UPVOTE_WEIGHT
+                )
+            )
+            key, _ = stats_rollup.snapshot(issues[issue_id])
+            stats_rollup.accumulate(rollup_deltas, (key, [0, priority_calculator.UPVOTE_WEIGHT, 1, 0]), count)
+        stats_rollup.apply(rollup_deltas)
+        
+        for user_id, count in votes_per_user.items():
+            db.session.execute(
+                db.update(User)
+                .where(User.id == user_id)
+                .values(upvotes_given=User.upvotes_given + count, last_active=datetime.utcnow())
+            )
+        
+        db.session.commit()
+        return [
+            (issue_id, issues[issue_id].latitude, issues[issue_id].longitude)
+            for issue_id in votes_per_issue
+        ]
+
+# Priority Recomputation
+class PriorityScheduler:
+    def __init__(self, enabled, interval, batch_size, batch_pause_ms):
+        self.enabled = enabled
+        self.INTERVAL = interval  # seconds between incremental runs
+        self.BATCH_SIZE = batch_size  # issues per bulk UPDATE
+        self.BATCH_PAUSE = batch_pause_ms / 1000  # throttle between batches
+        self.run_requested = threading.Event()
+        self.full_run_requested = False
+        self.run_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.worker = None
+        self.last_run_started = None
+        self.metrics = {
+            'state': 'idle',
+            'mode': None,
+            'runs': 0,
+            'scanned': 0,
+            'updated': 0,
+            'batches': 0,
+            'started_at': None,
+            'finished_at': None,
+            'duration_ms': None,
+            'last_error': None
+        }
+
+    def start(self):
+        """Start the worker thread; the first incremental run happens straight away"""
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run, daemon=True)
+                self.worker.start()
+                self.run_requested.set()
+
+    def request_run(self, full=False):
+        """Ask the worker for a run as soon as the current one finishes"""
+        with self.lock:
+            self.full_run_requested = self.full_run_requested or full
+        self.run_requested.set()
+        self.start()
+
+    def status(self):
+        with self.lock:
+            return dict(self.metrics, enabled=self.enabled, pending=self.run_requested.is_set())
+
+    def run(self):
+        """Refresh every INTERVAL when enabled, and whenever a run is requested; disabled, only on request"""
+        while True:
+            self.run_requested.wait(self.INTERVAL if self.enabled else None)
+            self.run_requested.clear()
+            with self.lock:
+                full, self.full_run_requested = self.full_run_requested, False
+            try:
+                self.refresh(full)
+            except Exception as e:
+                app.logger.error(f'Priority refresh failed: {e}')
+                with self.lock:
+                    self.metrics.update(state='idle', last_error=str(e))
+
+    def refresh(self, full=False):
+        """Recompute stale priorities, BATCH_SIZE issues per bulk UPDATE.
+
+        An incremental run only visits issues whose age bonus is still below
+        the cap and rewrites those whose day count moved on. A full run also
+        recomputes every base priority, e.g. after the weights change.
+        """
+        started = datetime.utcnow()
+        with self.lock:
+            self.metrics.update(
+                state='running', mode='full' if full else 'incremental', scanned=0, updated=0,
+                batches=0, started_at=started.isoformat(), finished_at=None, duration_ms=None
+            )
+        
+        with self.run_lock, app.app_context():
+            cursor = None
+            while True:
+                changed, cursor, scanned = self.refresh_batch(cursor, full)
+                if not scanned:
+                    break
+                
+                with self.lock:
+                    self.metrics['scanned'] += scanned
+                    self.metrics['updated'] += len(changed)
+                    self.metrics['batches'] += 1
+                
+                for issue_id, latitude, longitude, priority in changed:
+                    notify_issue_changed(issue_id, latitude, longitude)
+                    change_feed.publish('priority', latitude, longitude, {'id': issue_id, 'priority': priority})
+                
+                time.sleep(self.BATCH_PAUSE)
+        
+        finished = datetime.utcnow()
+        self.last_run_started = started
+        with self.lock:
+            self.metrics.update(
+                state='idle', runs=self.metrics['runs'] + 1, finished_at=finished.isoformat(),
+                duration_ms=round((finished - started).total_seconds() * 1000), last_error=None
+            )
+
+    def age_window_start(self):
+        """Issues created before this already got the capped age bonus in the previous run"""
+        if self.last_run_started is None:
+            return None
+        cap_days = math.ceil(priority_calculator.AGE_CAP / priority_calculator.AGE_WEIGHT)
+        return self.last_run_started - timedelta(days=cap_days)
+
+    def refresh_batch(self, cursor, full):
+        """Update the next batch of issues after cursor in a single statement.
+
+        A full run pages through every issue by id. An incremental run pages
+        by (created_at, id) through the issues that were still short of the
+        age cap at the previous run, so its cost follows recent reports
+        instead of the table size.
+        """
+        age_bonus = priority_calculator.age_bonus_expression(Issue.created_at)
+        base_priority = priority_calculator.base_priority_expression(Issue)
+        
+        columns = [Issue.id, Issue.latitude, Issue.longitude, Issue.base_priority, Issue.age_bonus,
+                   age_bonus.label('new_age_bonus')]
+        if full:
+            columns += [base_priority.label('new_base_priority'), Issue.ward, Issue.created_at, Issue.type,
+                        Issue.severity, Issue.status, Issue.upvotes, Issue.estimated_repair_time]
+        
+        if full:
+            statement = db.select(*columns).order_by(Issue.id)
+            if cursor is not None:
+                statement = statement.where(Issue.id > cursor)
+        else:
+            columns.append(Issue.created_at)
+            statement = (
+                db.select(*columns)
+                .where(Issue.age_bonus < priority_calculator.AGE_CAP)
+                .order_by(Issue.created_at, Issue.id)
+            )
+            window_start = self.age_window_start()
+            if window_start is not None:
+                statement = statement.where(Issue.created_at >= window_start)
+            if cursor is not None:
+                last_created_at, last_id = cursor
+                statement = statement.where(or_(
+                    Issue.created_at > last_created_at,
+                    and_(Issue.created_at == last_created_at, Issue.id > last_id)
+                ))
+        rows = db.session.execute(statement.limit(self.BATCH_SIZE)).all()
+        if not rows:
+            return [], cursor, 0
+        
+        changed = []
+        rollup_deltas = {}
+        for row in rows:
+            new_base_priority = row.new_base_priority if full else row.base_priority
+            base_delta = (new_base_priority or 0) - (row.base_priority or 0)
+            if abs(row.new_age_bonus - (row.age_bonus or 0)) < 1e-9 and abs(base_delta) < 1e-9:
+                continue
+            changed.append((row.id, row.latitude, row.longitude, round(new_base_priority + row.new_age_bonus, 1)))
+            if full and base_delta:
+                key, _ = stats_rollup.snapshot(row)
+                stats_rollup.accumulate(rollup_deltas, (key, [0, base_delta, 0, 0]), 1)
+        
+        if changed:
+            # Recompute in SQL so concurrent upvotes are never overwritten, and
+            # keep updated_at: a priority refresh is not an edit of the issue
+            values = {'age_bonus': age_bonus, 'updated_at': Issue.updated_at}
+            if full:
+                values['base_priority'] = base_priority
+            db.session.execute(
+                db.update(Issue)
+                .where(Issue.id.in_([issue_id for issue_id, _, _, _ in changed]))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            stats_rollup.apply(rollup_deltas)
+            db.session.commit()
         
-        return round(score, 1)
+        next_cursor = rows[-1].id if full else (rows[-1].created_at, rows[-1].id)
+        return changed, next_cursor, len(rows)
+
+# Photo Processing
+def compute_dhash(image):
+    """64-bit difference hash: brightness gradients of a 9x8 grayscale thumbnail"""
+    pixels = list(image.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return f'{bits:016x}'
+
+def process_photo(source_path, upload_folder, sizes):
+    """Decode an upload, strip its metadata and write the original, resized variants.
+
+    Runs in a worker process so the CPU-bound PIL work never holds the GIL of
+    request threads. Files are named by the sha256 of the uploaded bytes, so
+    identical uploads are stored once.
+    """
+    try:
+        digest = hashlib.sha256()
+        with open(source_path, 'rb') as source:
+            for block in iter(lambda: source.read(64 * 1024), b''):
+                digest.update(block)
+        content_hash = digest.hexdigest()
+        
+        filenames = {'original': f'{content_hash}.jpg'}
+        filenames.update({variant: f'{content_hash}_{variant}.jpg' for variant in sizes})
+        already_stored = all(
+            os.path.exists(os.path.join(upload_folder, filename)) for filename in filenames.values()
+        )
+        
+        with Image.open(source_path) as image:
+            # Apply the EXIF orientation, then drop EXIF (including GPS) by re-encoding
+            image = ImageOps.exif_transpose(image).convert('RGB')
+            phash = compute_dhash(image)
+            
+            if not already_stored:
+                variants = {'original': (image, 90)}
+                for variant, longest_side in sizes.items():
+                    resized = image.copy()
+                    resized.thumbnail((longest_side, longest_side))
+                    variants[variant] = (resized, 85)
+                
+                # Write then rename, so concurrent identical uploads never see partial files
+                for variant, (variant_image, quality) in variants.items():
+                    path = os.path.join(upload_folder, filenames[variant])
+                    temporary_path = f'{path}.{os.getpid()}.tmp'
+                    variant_image.save(temporary_path, 'JPEG', quality=quality)
+                    os.replace(temporary_path, path)
+        
+        return {'content_hash': content_hash, 'phash': phash, 'filenames': filenames}
+    finally:
+        # Undecodable uploads must not pile up in the upload folder either
+        if os.path.exists(source_path):
+            os.remove(source_path)
+
+def detect_image_format(header):
+    """Identify an image from its magic bytes, or return None"""
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+def read_image_dimensions(path):
+    """Read (width, height) from an image header without decoding the pixels"""
+    with Image.open(path) as image:
+        return image.size
+
+class PerceptualHashIndex:
+    def __init__(self, bands, max_distance):
+        self.BANDS = bands
+        self.MAX_DISTANCE = max_distance
+        self.BAND_BITS = 64 // bands
+        self.FLAT_BITS = 2  # hashes this close to all-zero or all-one come from blank or uniform photos
+
+    def is_flat(self, phash):
+        """Whether a hash has too few gradients to tell photos apart"""
+        set_bits = bin(int(phash, 16)).count('1')
+        return set_bits <= self.FLAT_BITS or set_bits >= 64 - self.FLAT_BITS
+
+    def bands(self, phash):
+        """Split a hex hash into (band, value) pairs"""
+        bits = int(phash, 16)
+        mask = (1 << self.BAND_BITS) - 1
+        return [(band, (bits >> (band * self.BAND_BITS)) & mask) for band in range(self.BANDS)]
+
+    def add(self, photo_id, phash):
+        """Index a photo's perceptual hash"""
+        for band, value in self.bands(phash):
+            db.session.merge(PhotoHashBand(photo_id=photo_id, band=band, value=value))
+
+    def find(self, phash, issue_ids=None):
+        """Return {issue_id: distance} for photos within MAX_DISTANCE bits of a hash.
+
+        Two hashes within BANDS - 1 bits share at least one exact band, so only
+        photos matching a band are fetched and compared.
+        """
+        query = db.session.query(Photo.issue_id, Photo.phash).join(
+            PhotoHashBand, PhotoHashBand.photo_id == Photo.id
+        ).filter(or_(*[
+            and_(PhotoHashBand.band == band, PhotoHashBand.value == value)
+            for band, value in self.bands(phash)
+        ]))
+        if issue_ids is not None:
+            query = query.filter(Photo.issue_id.in_(issue_ids))
+        
+        target = int(phash, 16)
+        matches = {}
+        for issue_id, candidate_hash in query.distinct():
+            distance = bin(target ^ int(candidate_hash, 16)).count('1')
+            if distance <= self.MAX_DISTANCE:
+                matches[issue_id] = min(distance, matches.get(issue_id, distance))
+        return matches
+
+class PhotoPipeline:
+    def __init__(self, workers, sizes):
+        self.WORKERS = workers
+        self.SIZES = sizes
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def submit(self, photo_id, source_path):
+        """Hand an uploaded photo to the process pool and record the result when done"""
+        with self.lock:
+            if self.executor is None:
+                # Forking would copy the request threads' locks and database connections
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.WORKERS, mp_context=multiprocessing.get_context('spawn')
+                )
+        
+        future = self.executor.submit(
+            process_photo, source_path, app.config['UPLOAD_FOLDER'], self.SIZES
+        )
+        future.add_done_callback(lambda done: self.complete(photo_id, done))
+        return future
+
+    def complete(self, photo_id, future):
+        """Store the processed variants, or mark the photo as failed"""
+        with app.app_context():
+            photo = db.session.get(Photo, photo_id)
+            if not photo:
+                return
+            
+            try:
+                result = future.result()
+                filenames = result['filenames']
+                photo.content_hash = result['content_hash']
+                photo.phash = result['phash']
+                photo.filename = filenames['original']
+                photo.file_path = os.path.join(app.config['UPLOAD_FOLDER'], filenames['original'])
+                photo.medium_filename = filenames.get('medium')
+                photo.thumbnail_filename = filenames.get('thumbnail')
+                photo.status = 'ready'
+                photo_hash_index.add(photo.id, photo.phash)
+                
+                # Photos arrive after their report, so this is where the photo signal can apply
+                issue = photo.issue
+                if issue.duplicate_of is None and issue.status == 'reported' and not photo_hash_index.is_flat(photo.phash):
+                    duplicate = duplicate_detector.find_photo_duplicate(issue, photo.phash)
+                    if duplicate is not None:
+                        issue.duplicate_of = duplicate.id
+            except Exception as e:
+                app.logger.error(f'Processing photo {photo_id} failed: {e}')
+                photo.status = 'failed'
+                photo.medium_filename = None
+                photo.thumbnail_filename = None
+            
+            db.session.commit()
+            response_cache.bump(photo.issue_id, photo.issue.latitude, photo.issue.longitude)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+# HTTP Response Cache
+class ResponseCache:
+    def __init__(self, max_entries, region_size, shared_path=None, shared_size=20000, ttl=60):
+        self.MAX_ENTRIES = max_entries
+        self.REGION_SIZE = region_size
+        self.TTL = ttl  # seconds; versions roll over at every multiple of it
+        self.MAX_REGION_SCOPES = 64  # larger areas depend on the global version instead
+        self.MAX_SHARED_ENTRIES = shared_size
+        self.PRUNE_INTERVAL = 100  # shared puts between trims of the responses table
+        self.shared_puts = 0
+        self.entries = OrderedDict()  # key -> (etag, body, mimetype)
+        self.versions = {}  # scope -> (version, modified_at)
+        self.started_at = datetime.utcnow().replace(microsecond=0)
+        self.lock = threading.Lock()
+        self.shared = None
+        
+        # Per-process versions restart at zero, so keep ETags from a previous run from matching
+        self.epoch = uuid.uuid4().hex
+        
+        if shared_path:
+            self.epoch = 'shared'
+            self.shared = sqlite3.connect(shared_path, check_same_thread=False, isolation_level=None)
+            self.shared.execute('PRAGMA journal_mode = WAL')
+            self.shared.execute(
+                'CREATE TABLE IF NOT EXISTS versions '
+                '(scope TEXT PRIMARY KEY, version INTEGER NOT NULL, modified_at REAL NOT NULL)'
+            )
+            # The table only holds cached bodies, so an older layout is simply dropped
+            columns = {row[1] for row in self.shared.execute('PRAGMA table_info(responses)')}
+            if columns and 'stored_at' not in columns:
+                self.shared.execute('DROP TABLE responses')
+            self.shared.execute(
+                'CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, etag TEXT NOT NULL, '
+                'body BLOB NOT NULL, mimetype TEXT NOT NULL, stored_at REAL NOT NULL)'
+            )
+            self.shared.execute('CREATE INDEX IF NOT EXISTS ix_responses_stored_at ON responses (stored_at)')
+
+    def region_for(self, latitude, longitude):
+        return f'region:{math.floor(latitude / self.REGION_SIZE)}:{math.floor(longitude / self.REGION_SIZE)}'
+
+    def region_scopes(self, min_lat, max_lat, min_lng, max_lng):
+        """Version scopes of every region intersecting a bounding box"""
+        rows = range(math.floor(min_lat / self.REGION_SIZE), math.floor(max_lat / self.REGION_SIZE) + 1)
+        cols = range(math.floor(min_lng / self.REGION_SIZE), math.floor(max_lng / self.REGION_SIZE) + 1)
+        if len(rows) * len(cols) > self.MAX_REGION_SCOPES:
+            return ['global']
+        return [f'region:{row}:{col}' for row in rows for col in cols]
+
+    def bump(self, issue_id, latitude, longitude):
+        """Advance the versions an issue write affects"""
+        scopes = ['global', self.region_for(latitude, longitude), f'issue:{issue_id}']
+        now = datetime.utcnow()
+        
+        with self.lock:
+            if self.shared:
+                for scope in scopes:
+                    self.shared.execute(
+                        'INSERT INTO versions (scope, version, modified_at) VALUES (?, 1, ?) '
+                        'ON CONFLICT (scope) DO UPDATE SET version = version + 1, modified_at = excluded.modified_at',
+                        (scope, now.timestamp())
+                    )
+                return
+            for scope in scopes:
+                version, _ = self.versions.get(scope, (0, None))
+                self.versions[scope] = (version + 1, now)
+
+    def versions_for(self, scopes):
+        """Return a version fingerprint and the last modification time for some scopes"""
+        with self.lock:
+            if self.shared:
+                placeholders = ', '.join('?' for _ in scopes)
+                rows = self.shared.execute(
+                    f'SELECT scope, version, modified_at FROM versions WHERE scope IN ({placeholders})',
+                    scopes
+                ).fetchall()
+                known = {
+                    scope: (version, datetime.utcfromtimestamp(modified_at))
+                    for scope, version, modified_at in rows
+                }
+            else:
+                known = {scope: self.versions[scope] for scope in scopes if scope in self.versions}
+        
+        fingerprint = self.epoch + ':' + ','.join(str(known.get(scope, (0, None))[0]) for scope in scopes)
+        modified = [modified_at for _, modified_at in known.values()]
+        last_modified = max(modified).replace(microsecond=0) if modified else self.started_at
+        
+        # Wall-clock buckets line up across processes, so expiry never splits their ETags
+        if self.TTL:
+            bucket = int(time.time() // self.TTL)
+            fingerprint += f'@{bucket}'
+            last_modified = max(last_modified, datetime.utcfromtimestamp(bucket * self.TTL))
+        return fingerprint, last_modified
+
+    def get(self, key, etag):
+        """Return (body, mimetype) cached for a key at a given ETag, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == etag:
+                self.entries.move_to_end(key)
+                return entry[1:]
+            if self.shared:
+                row = self.shared.execute(
+                    'SELECT body, mimetype FROM responses WHERE key = ? AND etag = ?', (key, etag)
+                ).fetchone()
+                if row:
+                    self.remember(key, etag, *row)
+                    return row
+        return None
+
+    def put(self, key, etag, body, mimetype):
+        with self.lock:
+            self.remember(key, etag, body, mimetype)
+            if self.shared:
+                self.shared.execute(
+                    'INSERT OR REPLACE INTO responses (key, etag, body, mimetype, stored_at) VALUES (?, ?, ?, ?, ?)',
+                    (key, etag, body, mimetype, time.time())
+                )
+                self.shared_puts += 1
+                if self.shared_puts % self.PRUNE_INTERVAL == 0:
+                    self.prune_shared()
+
+    def prune_shared(self):
+        """Delete all but the MAX_SHARED_ENTRIES most recently stored shared responses"""
+        self.shared.execute(
+            'DELETE FROM responses WHERE stored_at <= '
+            '(SELECT stored_at FROM responses ORDER BY stored_at DESC LIMIT 1 OFFSET ?)',
+            (self.MAX_SHARED_ENTRIES,)
+        )
+
+    def remember(self, key, etag, body, mimetype):
+        self.entries[key] = (etag, body, mimetype)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.MAX_ENTRIES:
+            self.entries.popitem(last=False)
+
+# Change Feed
+class ChangeSubscription:
+    def __init__(self, min_lat, max_lat, min_lng, max_lng):
+        self.bbox = (min_lat, max_lat, min_lng, max_lng)
+        self.events = queue.Queue()
+        self.resync = False
+
+    def matches(self, latitude, longitude):
+        min_lat, max_lat, min_lng, max_lng = self.bbox
+        return min_lat <= latitude <= max_lat and min_lng <= longitude <= max_lng
+
+class ChangeFeed:
+    def __init__(self, queue_size, history_size):
+        self.QUEUE_SIZE = queue_size
+        self.subscribers = set()
+        self.history = deque(maxlen=history_size)
+        self.sequence = 0
+        self.listeners = []  # in-process consumers, called synchronously on publish
+        self.lock = threading.Lock()
+
+    def listen(self, listener):
+        """Call listener(change, latitude, longitude, delta) for every published change"""
+        self.listeners.append(listener)
+
+    def publish(self, change, latitude, longitude, delta):
+        """Fan a change out to every subscriber whose bounding box contains it"""
+        data = json.dumps(delta, default=str, separators=(',', ':'))
+        
+        with self.lock:
+            self.sequence += 1
+            event = (self.sequence, change, latitude, longitude, data)
+            self.history.append(event)
+            
+            for subscription in list(self.subscribers):
+                if not subscription.matches(latitude, longitude):
+                    continue
+                if subscription.events.qsize() >= self.QUEUE_SIZE:
+                    # A consumer this far behind is better off refetching than catching up
+                    self.subscribers.discard(subscription)
+                    subscription.resync = True
+                    subscription.events.put(None)
+                    continue
+                subscription.events.put(event)
+        
+        for listener in self.listeners:
+            listener(change, latitude, longitude, delta)
+
+    def subscribe(self, min_lat, max_lat, min_lng, max_lng, last_event_id=None):
+        """Register a subscription, replaying the events a reconnecting client missed"""
+        subscription = ChangeSubscription(min_lat, max_lat, min_lng, max_lng)
+        
+        with self.lock:
+            if last_event_id is not None:
+                oldest = self.history[0][0] if self.history else self.sequence + 1
+                if last_event_id + 1 < oldest or last_event_id > self.sequence:
+                    subscription.resync = True
+                else:
+                    for event in self.history:
+                        if event[0] > last_event_id and subscription.matches(event[2], event[3]):
+                            subscription.events.put(event)
+            self.subscribers.add(subscription)
+        
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+
+# Repair Crew Work Queue
+class IndexedHeap:
+    """Max-heap of (priority, item) supporting O(log n) re-prioritisation and removal by item"""
+    def __init__(self):
+        self.entries = []  # (priority, item)
+        self.positions = {}  # item -> index in entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def push(self, item, priority):
+        """Insert an item, or move it to a new priority"""
+        position = self.positions.get(item)
+        if position is None:
+            self.entries.append((priority, item))
+            self.positions[item] = len(self.entries) - 1
+            self.sift_up(len(self.entries) - 1)
+            return
+        
+        old_priority = self.entries[position][0]
+        self.entries[position] = (priority, item)
+        if priority > old_priority:
+            self.sift_up(position)
+        else:
+            self.sift_down(position)
+
+    def remove(self, item):
+        position = self.positions.pop(item, None)
+        if position is None:
+            return
+        
+        last = self.entries.pop()
+        if position < len(self.entries):
+            self.entries[position] = last
+            self.positions[last[1]] = position
+            self.sift_up(position)
+            self.sift_down(self.positions[last[1]])
+
+    def ordered(self):
+        """Yield (priority, item) from highest priority down, visiting only what is consumed"""
+        if not self.entries:
+            return
+        frontier = [(-self.entries[0][0], 0)]
+        while frontier:
+            _, position = heapq.heappop(frontier)
+            yield self.entries[position]
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(self.entries):
+                    heapq.heappush(frontier, (-self.entries[child][0], child))
+
+    def sift_up(self, position):
+        while position > 0:
+            parent = (position - 1) // 2
+            if self.entries[position][0] <= self.entries[parent][0]:
+                break
+            self.swap(position, parent)
+            position = parent
+
+    def sift_down(self, position):
+        size = len(self.entries)
+        while True:
+            largest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < size and self.entries[child][0] > self.entries[largest][0]:
+                    largest = child
+            if largest == position:
+                return
+            self.swap(position, largest)
+            position = largest
+
+    def swap(self, i, j):
+        self.entries[i], self.entries[j] = self.entries[j], self.entries[i]
+        self.positions[self.entries[i][1]] = i
+        self.positions[self.entries[j][1]] = j
+
+class WorkQueue:
+    def __init__(self, region_size, max_age, batch_radius):
+        self.OPEN_STATUSES = ('reported', 'verified')
+        self.REGION_SIZE = region_size  # degrees per region heap
+        self.MAX_AGE = max_age  # seconds before reloading, to pick up other workers' writes
+        self.BATCH_RADIUS = batch_radius  # meters between jobs batched together
+        self.regions = {}  # (row, col) -> IndexedHeap of open issue ids
+        self.locations = {}  # issue id -> (latitude, longitude, region)
+        self.loaded_at = None
+        self.lock = threading.RLock()
+
+    def region_for(self, latitude, longitude):
+        return math.floor(latitude / self.REGION_SIZE), math.floor(longitude / self.REGION_SIZE)
+
+    def load(self):
+        """Rebuild the heaps from every open issue in the database"""
+        rows = db.session.execute(
+            db.select(Issue.id, Issue.latitude, Issue.longitude, Issue.priority)
+            .where(Issue.status.in_(self.OPEN_STATUSES))
+        ).all()
+        
+        with self.lock:
+            self.regions = {}
+            self.locations = {}
+            for issue_id, latitude, longitude, priority in rows:
+                self.upsert(issue_id, latitude, longitude, priority)
+            self.loaded_at = time.monotonic()
+
+    def upsert(self, issue_id, latitude, longitude, priority):
+        with self.lock:
+            region = self.region_for(latitude, longitude)
+            previous = self.locations.get(issue_id)
+            if previous and previous[2] != region:
+                self.remove(issue_id)
+            self.locations[issue_id] = (latitude, longitude, region)
+            self.regions.setdefault(region, IndexedHeap()).push(issue_id, priority)
+
+    def remove(self, issue_id):
+        with self.lock:
+            location = self.locations.pop(issue_id, None)
+            if location is None:
+                return
+            heap = self.regions[location[2]]
+            heap.remove(issue_id)
+            if not len(heap):
+                del self.regions[location[2]]
+
+    def apply_change(self, change, latitude, longitude, delta):
+        """Change feed listener keeping the heaps in step with committed writes"""
+        with self.lock:
+            if self.loaded_at is None:
+                return  # the first load reads the database anyway
+            
+            issue_id = delta['id']
+            if delta.get('status', self.OPEN_STATUSES[0]) not in self.OPEN_STATUSES:
+                self.remove(issue_id)
+            elif 'priority' in delta and (change in ('created', 'status') or issue_id in self.locations):
+                self.upsert(issue_id, latitude, longitude, delta['priority'])
+
+    def nearest_jobs(self, latitude, longitude, radius, limit):
+        """Return up to limit (issue_id, priority, distance) within radius meters, best first"""
+        with self.lock:
+            if self.loaded_at is None or time.monotonic() - self.loaded_at > self.MAX_AGE:
+                self.load()
+            
+            min_lat, max_lat, min_lng, max_lng = geo_utils.expand_bbox(latitude, longitude, radius)
+            row_min, col_min = self.region_for(min_lat, min_lng)
+            row_max, col_max = self.region_for(max_lat, max_lng)
+            
+            # Visit whichever is smaller: the regions under the circle or the occupied ones
+            if (row_max - row_min + 1) * (col_max - col_min + 1) > len(self.regions):
+                regions = [
+                    region for region in self.regions
+                    if row_min <= region[0] <= row_max and col_min <= region[1] <= col_max
+                ]
+            else:
+                regions = [
+                    (row, col)
+                    for row in range(row_min, row_max + 1)
+                    for col in range(col_min, col_max + 1)
+                    if (row, col) in self.regions
+                ]
+            
+            jobs = []
+            candidates = heapq.merge(
+                *[self.regions[region].ordered() for region in regions],
+                key=lambda entry: entry[0],
+                reverse=True
+            )
+            for priority, issue_id in candidates:
+                job_latitude, job_longitude, _ = self.locations[issue_id]
+                distance = geo_utils.haversine(latitude, longitude, job_latitude, job_longitude)
+                if distance <= radius:
+                    jobs.append((issue_id, priority, distance))
+                    if len(jobs) >= limit:
+                        break
+            return jobs
+
+    def batch_jobs(self, jobs):
+        """Group jobs around the best job of each neighbourhood, each batch in walking order"""
+        batches = []
+        for job in jobs:
+            latitude, longitude, _ = self.locations[job[0]]
+            for batch in batches:
+                anchor_latitude, anchor_longitude, _ = self.locations[batch[0][0]]
+                if geo_utils.equirectangular(anchor_latitude, anchor_longitude, latitude, longitude) <= self.BATCH_RADIUS:
+                    batch.append(job)
+                    break
+            else:
+                batches.append([job])
+        
+        # Nearest-neighbour route through each batch, starting at its highest priority job
+        routes = []
+        for batch in batches:
+            route = [batch[0]]
+            remaining = batch[1:]
+            while remaining:
+                last_latitude, last_longitude, _ = self.locations[route[-1][0]]
+                next_job = min(
+                    remaining,
+                    key=lambda job: geo_utils.equirectangular(last_latitude, last_longitude, *self.locations[job[0]][:2])
+                )
+                remaining.remove(next_job)
+                route.append(next_job)
+            routes.append(route)
+        return routes
 
 # Initialize services
+spatial_grid = SpatialGrid()
+spatial_index = SpatialIndex(app.config['SPATIAL_BACKEND'])
 duplicate_detector = DuplicateDetector()
 priority_calculator = PriorityCalculator()
+stats_rollup = StatsRollup()
+map_clusterer = MapClusterer(
+    app.config['CLUSTER_CACHE_SIZE'],
+    app.config['CLUSTER_MAX_CELLS'],
+    app.config['CLUSTER_CACHE_TTL']
+)
+tile_renderer = TileRenderer(
+    app.config['TILE_CACHE_SIZE'],
+    app.config['TILE_MAX_FEATURES'],
+    app.config['TILE_CACHE_TTL']
+)
+response_cache = ResponseCache(
+    app.config['RESPONSE_CACHE_SIZE'],
+    app.config['RESPONSE_CACHE_REGION_SIZE'],
+    app.config['RESPONSE_CACHE_PATH'],
+    app.config['RESPONSE_CACHE_SHARED_SIZE'],
+    app.config['RESPONSE_CACHE_TTL']
+)
+upvote_buffer = UpvoteBuffer(
+    app.config['UPVOTE_BUFFER_ENABLED'],
+    app.config['UPVOTE_FLUSH_INTERVAL_MS'],
+    app.config['UPVOTE_FLUSH_MAX_ENTRIES']
+)
+atexit.register(upvote_buffer.flush)
+priority_scheduler = PriorityScheduler(
+    app.config['PRIORITY_SCHEDULER_ENABLED'],
+    app.config['PRIORITY_REFRESH_INTERVAL'],
+    app.config['PRIORITY_BATCH_SIZE'],
+    app.config['PRIORITY_BATCH_PAUSE_MS']
+)
+change_feed = ChangeFeed(app.config['CHANGE_FEED_QUEUE_SIZE'], app.config['CHANGE_FEED_HISTORY_SIZE'])
+work_queue = WorkQueue(
+    app.config['WORK_QUEUE_REGION_SIZE'],
+    app.config['WORK_QUEUE_MAX_AGE'],
+    app.config['WORK_QUEUE_BATCH_RADIUS']
+)
+change_feed.listen(work_queue.apply_change)
+photo_pipeline = PhotoPipeline(app.config['PHOTO_WORKERS'], app.config['PHOTO_SIZES'])
+atexit.register(photo_pipeline.shutdown)
+photo_hash_index = PerceptualHashIndex(app.config['PHASH_BANDS'], app.config['PHASH_MAX_DISTANCE'])
+
+@event.listens_for(Issue, 'before_insert')
+@event.listens_for(Issue, 'before_update')
+def assign_grid_cell(mapper, connection, issue):
+    """Keep the spatial grid key in sync with the issue location"""
+    issue.grid_cell = spatial_grid.cell_for(issue.latitude, issue.longitude)
+
+# Report Ingestion Helpers
+def validate_report(data):
+    """Return an error message if a report is missing required fields"""
+    if not isinstance(data, dict):
+        return 'Invalid report payload'
+    
+    required_fields = ['type', 'latitude', 'longitude', 'address', 'description', 'reporter_id']
+    for field in required_fields:
+        if not data.get(field):
+            return f'Missing required field: {field}'
+    
+    photo_hash = data.get('photo_hash')
+    if photo_hash is not None and not (isinstance(photo_hash, str) and re.fullmatch(r'[0-9a-fA-F]{16}', photo_hash)):
+        return f'Invalid photo_hash: {photo_hash!r}'
+    
+    for field, limit in (('latitude', 90), ('longitude', 180)):
+        try:
+            value = float(data[field])
+        except (TypeError, ValueError):
+            return f'Invalid {field}: {data[field]!r}'
+        if not math.isfinite(value) or abs(value) > limit:
+            return f'Invalid {field}: {data[field]!r}'
+    
+    return None
+
+def merge_report(existing_issue, data):
+    """Fold a duplicate report into an existing issue"""
+    existing_issue.upvotes += 1
+    
+    # Update severity if new one is higher
+    severity_levels = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
+    severity = data.get('severity', 'medium')
+    if severity_levels.get(severity, 2) > severity_levels.get(existing_issue.severity, 2):
+        existing_issue.severity = severity
+    
+    # Recalculate priority
+    existing_issue.base_priority = priority_calculator.calculate_base_priority(existing_issue)
+
+def create_issue_from_report(data):
+    """Build a new, not yet persisted issue from a report"""
+    issue = Issue(
+        id=str(uuid.uuid4()),
+        type=data['type'],
+        latitude=float(data['latitude']),
+        longitude=float(data['longitude']),
+        address=data['address'],
+        severity=data.get('severity', 'medium'),
+        description=data['description'],
+        status='reported',
+        upvotes=0,
+        age_bonus=0.0,
+        road_type=data.get('road_type', 'other'),
+        ward=data.get('ward'),
+        reporter_id=data['reporter_id'],
+        created_at=datetime.utcnow()
+    )
+    
+    # Index the issue right away so later reports in the same batch can match it
+    issue.grid_cell = spatial_grid.cell_for(issue.latitude, issue.longitude)
+    
+    # Calculate initial priority
+    issue.base_priority = priority_calculator.calculate_base_priority(issue)
+    
+    return issue
+
+def serialize_issues(issues):
+    """Serialize many issues with a constant number of queries for photos and upvoters"""
+    if not issues:
+        return []
+    
+    issue_ids = [issue.id for issue in issues]
+    
+    photos_by_issue = {}
+    photos = Photo.query.filter(Photo.issue_id.in_(issue_ids)).order_by(Photo.uploaded_at).all()
+    for photo in photos:
+        photos_by_issue.setdefault(photo.issue_id, []).append(photo)
+    
+    # Only the ids are needed, so read the association table without loading User rows
+    upvoters_by_issue = {}
+    upvotes = db.session.execute(
+        db.select(issue_upvotes.c.issue_id, issue_upvotes.c.user_id)
+        .where(issue_upvotes.c.issue_id.in_(issue_ids))
+    )
+    for issue_id, user_id in upvotes:
+        upvoters_by_issue.setdefault(issue_id, []).append(user_id)
+    
+    return [
+        upvote_buffer.overlay(issue.to_dict(
+            photos=photos_by_issue.get(issue.id, []),
+            upvoter_ids=upvoters_by_issue.get(issue.id, [])
+        ))
+        for issue in issues
+    ]
+
+def notify_issue_changed(issue_id, latitude, longitude):
+    """Invalidate derived map data after a committed write to an issue at a location"""
+    map_clusterer.invalidate(latitude, longitude)
+    tile_renderer.invalidate(latitude, longitude)
+    response_cache.bump(issue_id, latitude, longitude)
+
+CHANGE_FIELDS = {
+    'created': ['id', 'type', 'latitude', 'longitude', 'severity', 'status', 'upvotes', 'priority'],
+    'merged': ['id', 'severity', 'upvotes', 'priority'],
+    'upvoted': ['id', 'upvotes', 'priority'],
+    'status': ['id', 'status', 'priority']
+}
+
+def publish_issue_change(issue, change):
+    """Push a compact delta of a committed issue change onto the change feed"""
+    delta = {field: getattr(issue, field) for field in CHANGE_FIELDS[change]}
+    
+    # Buffered upvotes are already visible to readers, so include them here too
+    pending_votes = len(upvote_buffer.pending_upvoters(issue.id))
+    if 'upvotes' in delta:
+        delta['upvotes'] += pending_votes
+    if 'priority' in delta:
+        delta['priority'] = round(delta['priority'] + pending_votes * priority_calculator.UPVOTE_WEIGHT, 1)
+    
+    change_feed.publish(change, issue.latitude, issue.longitude, delta)
+
+def cached_response(scopes_for, vary=None):
+    """Serve a read endpoint from the response cache, answering conditional requests.
+
+    scopes_for receives the view arguments and returns the data version scopes
+    the response depends on. The ETag is derived from the normalized request
+    and those versions, so a matching If-None-Match gets a 304 before the view
+    (and the database) is touched. vary, if given, returns extra state the
+    response depends on beyond the request, and is folded into the key.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request.path + '?' + urlencode(sorted(request.args.items(multi=True)))
+            if vary:
+                key += '#' + vary()
+            versions, last_modified = response_cache.versions_for(scopes_for(*args, **kwargs))
+            etag = hashlib.sha1(f'{key}|{versions}'.encode('utf-8')).hexdigest()
+            
+            cached = None
+            if etag not in request.if_none_match:
+                cached = response_cache.get(key, etag)
+                if cached is None:
+                    response = app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    cached = (response.get_data(), response.mimetype)
+                    response_cache.put(key, etag, *cached)
+            
+            body, mimetype = cached or (b'', 'application/json')
+            response = app.response_class(body, mimetype=mimetype)
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'no-cache'
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+def map_cache_scopes():
+    """Version scopes for /api/issues/map: the regions covered by its bounding box"""
+    try:
+        return response_cache.region_scopes(
+            float(request.args.get('minLat', 12.8)),
+            float(request.args.get('maxLat', 13.2)),
+            float(request.args.get('minLng', 77.4)),
+            float(request.args.get('maxLng', 77.8))
+        )
+    except ValueError:
+        return ['global']
+
+# Columns available to the compact marker view of /api/issues/map
+MARKER_FIELDS = {
+    'id': Issue.id,
+    'type': Issue.type,
+    'latitude': Issue.latitude,
+    'longitude': Issue.longitude,
+    'severity': Issue.severity,
+    'status': Issue.status,
+    'upvotes': Issue.upvotes,
+    'priority': Issue.priority.label('priority'),
+    'description': Issue.description,
+    'address': Issue.address
+}
+
+def query_marker_columns(fields, conditions, ordering, limit):
+    """Select only the requested columns and return them as parallel arrays"""
+    statement = (
+        db.select(*[MARKER_FIELDS[field] for field in fields])
+        .where(and_(*conditions))
+        .order_by(*ordering)
+        .limit(limit)
+    )
+    rows = db.session.execute(statement).all()
+    
+    columns = {field: [] for field in fields}
+    for row in rows:
+        for field, value in zip(fields, row):
+            columns[field].append(value)
+    
+    if 'priority' in columns:
+        columns['priority'] = [round(value, 1) for value in columns['priority']]
+    
+    # Merge buffered upvotes that have not been written yet
+    if 'id' in columns and (upvote_buffer.pending or upvote_buffer.in_flight):
+        for index, issue_id in enumerate(columns['id']):
+            pending_votes = len(upvote_buffer.pending_upvoters(issue_id))
+            if not pending_votes:
+                continue
+            if 'upvotes' in columns:
+                columns['upvotes'][index] += pending_votes
+            if 'priority' in columns:
+                columns['priority'][index] = round(
+                    columns['priority'][index] + pending_votes * priority_calculator.UPVOTE_WEIGHT, 1
+                )
+    
+    return {
+        'success': True,
+        'view': 'marker',
+        'fields': fields,
+        'columns': columns,
+        'count': len(rows)
+    }
 
 # API Routes
 @app.route('/')
@@ -307,88 +2373,249 @@ def register_user():
         
         return jsonify({
             'success': True,
-            'message': 'User created successfully',
-            'user': user.to_dict()
-        }), 201
+            'message': 'User created successfully',
+            'user': user.to_dict()
+        }), 201
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/issues/report', methods=['POST'])
+def report_issue():
+    try:
+        data = request.get_json()
+        
+        # Validate required fields
+        error = validate_report(data)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+        
+        # Check for duplicates
+        potential_duplicates = duplicate_detector.find_potential_duplicates(data)
+        best_match = next((dup for dup in potential_duplicates if dup['is_duplicate']), None)
+        
+        if best_match:
+            # Merge with existing issue
+            existing_issue = best_match['issue']
+            before = stats_rollup.snapshot(existing_issue)
+            merge_report(existing_issue, data)
+            stats_rollup.record(before, stats_rollup.snapshot(existing_issue))
+            
+            db.session.commit()
+            notify_issue_changed(existing_issue.id, existing_issue.latitude, existing_issue.longitude)
+            publish_issue_change(existing_issue, 'merged')
+            
+            return jsonify({
+                'success': True,
+                'message': 'Issue merged with existing report',
+                'merged_with': existing_issue.id,
+                'is_duplicate': True
+            })
+        
+        # Create new issue
+        issue = create_issue_from_report(data)
+        db.session.add(issue)
+        stats_rollup.record(None, stats_rollup.snapshot(issue))
+        
+        # Update user stats
+        user = User.query.get(data['reporter_id'])
+        if user:
+            user.reports_count += 1
+            user.last_active = datetime.utcnow()
+        
+        db.session.commit()
+        notify_issue_changed(issue.id, issue.latitude, issue.longitude)
+        publish_issue_change(issue, 'created')
+        
+        return jsonify({
+            'success': True,
+            'message': 'Issue reported successfully',
+            'issue': issue.to_dict(),
+            'is_duplicate': False
+        }), 201
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/issues/report/batch', methods=['POST'])
+def report_issues_batch():
+    try:
+        data = request.get_json()
+        reports = data.get('reports') if isinstance(data, dict) else data
+        
+        if not isinstance(reports, list) or not reports:
+            return jsonify({
+                'success': False,
+                'error': 'reports must be a non-empty list'
+            }), 400
+        
+        if len(reports) > app.config['MAX_BATCH_REPORTS']:
+            return jsonify({
+                'success': False,
+                'error': f"Batch too large, at most {app.config['MAX_BATCH_REPORTS']} reports allowed"
+            }), 400
+        
+        errors = [validate_report(report) for report in reports]
+        valid_reports = [report for report, error in zip(reports, errors) if not error]
+        
+        # Load duplicate candidates for the whole batch with a single query
+        candidate_index = duplicate_detector.index_candidates(
+            duplicate_detector.fetch_candidates(valid_reports) if valid_reports else []
+        )
+        
+        results = []
+        touched_issues = []
+        created_issues = []
+        reports_per_user = {}
+        
+        for index, (report, error) in enumerate(zip(reports, errors)):
+            if error:
+                results.append({'success': False, 'error': error})
+                continue
+            
+            # Check for duplicates, including issues created earlier in this batch
+            potential_duplicates = duplicate_detector.rank_candidates(report, candidate_index)
+            best_match = next((dup for dup in potential_duplicates if dup['is_duplicate']), None)
+            
+            if best_match:
+                existing_issue = best_match['issue']
+                before = stats_rollup.snapshot(existing_issue)
+                merge_report(existing_issue, report)
+                stats_rollup.record(before, stats_rollup.snapshot(existing_issue))
+                touched_issues.append((existing_issue, 'merged'))
+                results.append({
+                    'success': True,
+                    'message': 'Issue merged with existing report',
+                    'merged_with': existing_issue.id,
+                    'is_duplicate': True
+                })
+                continue
+            
+            issue = create_issue_from_report(report)
+            db.session.add(issue)
+            stats_rollup.record(None, stats_rollup.snapshot(issue))
+            touched_issues.append((issue, 'created'))
+            candidate_index.setdefault((issue.type, issue.grid_cell), []).append(issue)
+            created_issues.append((index, issue))
+            reports_per_user[issue.reporter_id] = reports_per_user.get(issue.reporter_id, 0) + 1
+            results.append(None)
+        
+        # Update user stats in bulk
+        if reports_per_user:
+            users = User.query.filter(User.id.in_(list(reports_per_user))).all()
+            for user in users:
+                user.reports_count += reports_per_user[user.id]
+                user.last_active = datetime.utcnow()
+        
+        # Write the whole batch in a single transaction
+        db.session.commit()
+        for issue, change in touched_issues:
+            notify_issue_changed(issue.id, issue.latitude, issue.longitude)
+            publish_issue_change(issue, change)
+        
+        serialized_issues = serialize_issues([issue for _, issue in created_issues])
+        for (index, issue), serialized_issue in zip(created_issues, serialized_issues):
+            results[index] = {
+                'success': True,
+                'message': 'Issue reported successfully',
+                'issue': serialized_issue,
+                'is_duplicate': False
+            }
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'created': len(created_issues),
+            'merged': sum(1 for result in results if result.get('is_duplicate')),
+            'failed': sum(1 for error in errors if error)
+        })
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
-@app.route('/api/issues/report', methods=['POST'])
-def report_issue():
+@app.route('/api/issues/map', methods=['GET'])
+@cached_response(lambda: map_cache_scopes())
+def get_issues_map():
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['type', 'latitude', 'longitude', 'address', 'description', 'reporter_id']
-        for field in required_fields:
-            if not data.get(field):
+        min_lat = float(request.args.get('minLat', 12.8))
+        max_lat = float(request.args.get('maxLat', 13.2))
+        min_lng = float(request.args.get('minLng', 77.4))
+        max_lng = float(request.args.get('maxLng', 77.8))
+        types = request.args.get('types', '').split(',') if request.args.get('types') else []
+        statuses = request.args.get('statuses', '').split(',') if request.args.get('statuses') else []
+        limit = int(request.args.get('limit', 1000))
+        view = request.args.get('view', 'full')
+        fields = request.args.get('fields', '').split(',') if request.args.get('fields') else []
+        zoom = request.args.get('zoom')
+        
+        if zoom is not None:
+            try:
+                zoom = int(zoom)
+            except ValueError:
+                zoom = -1
+            if zoom < 0:
                 return jsonify({
                     'success': False,
-                    'error': f'Missing required field: {field}'
+                    'error': 'zoom must be a non-negative integer'
                 }), 400
         
-        # Check for duplicates
-        potential_duplicates = duplicate_detector.find_potential_duplicates(data)
-        best_match = next((dup for dup in potential_duplicates if dup['is_duplicate']), None)
-        
-        if best_match:
-            # Merge with existing issue
-            existing_issue = best_match['issue']
-            existing_issue.upvotes += 1
-            
-            # Update severity if new one is higher
-            severity_levels = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
-            if severity_levels.get(data['severity'], 2) > severity_levels.get(existing_issue.severity, 2):
-                existing_issue.severity = data['severity']
-            
-            # Recalculate priority
-            existing_issue.priority = priority_calculator.calculate_priority(existing_issue)
-            
-            db.session.commit()
-            
+        # Zoomed-out views get per-cell clusters instead of individual issues
+        if zoom is not None and zoom < app.config['CLUSTER_ZOOM_THRESHOLD']:
+            zoom, clusters = map_clusterer.get_clusters(
+                zoom, min_lat, max_lat, min_lng, max_lng, types, statuses
+            )
             return jsonify({
                 'success': True,
-                'message': 'Issue merged with existing report',
-                'merged_with': existing_issue.id,
-                'is_duplicate': True
+                'view': 'clusters',
+                'zoom': zoom,
+                'clusters': clusters,
+                'count': len(clusters)
             })
         
-        # Create new issue
-        issue = Issue(
-            type=data['type'],
-            latitude=data['latitude'],
-            longitude=data['longitude'],
-            address=data['address'],
-            severity=data.get('severity', 'medium'),
-            description=data['description'],
-            road_type=data.get('road_type', 'other'),
-            ward=data.get('ward'),
-            reporter_id=data['reporter_id']
-        )
+        # Build filters
+        conditions = spatial_index.within_bbox(min_lat, max_lat, min_lng, max_lng)
         
-        # Calculate initial priority
-        issue.priority = priority_calculator.calculate_priority(issue)
+        if types:
+            conditions.append(Issue.type.in_(types))
         
-        db.session.add(issue)
-        db.session.commit()
+        if statuses:
+            conditions.append(Issue.status.in_(statuses))
         
-        # Update user stats
-        user = User.query.get(data['reporter_id'])
-        if user:
-            user.reports_count += 1
-            user.last_active = datetime.utcnow()
-            db.session.commit()
+        # Priority is ordered in SQL, with the age bonus evaluated by the database
+        ordering = [Issue.priority.desc(), Issue.created_at.desc()]
+        
+        if view == 'marker' or fields:
+            fields = fields or list(MARKER_FIELDS)
+            unknown_fields = [field for field in fields if field not in MARKER_FIELDS]
+            if unknown_fields:
+                return jsonify({
+                    'success': False,
+                    'error': f"Unknown fields: {', '.join(unknown_fields)}",
+                    'valid_fields': list(MARKER_FIELDS)
+                }), 400
+            
+            return jsonify(query_marker_columns(fields, conditions, ordering, limit))
+        
+        issues = Issue.query.filter(and_(*conditions)).order_by(*ordering).limit(limit).all()
         
         return jsonify({
             'success': True,
-            'message': 'Issue reported successfully',
-            'issue': issue.to_dict(),
-            'is_duplicate': False
-        }), 201
+            'issues': serialize_issues(issues),
+            'count': len(issues)
+        })
         
     except Exception as e:
         return jsonify({
@@ -396,39 +2623,116 @@ def report_issue():
             'error': str(e)
         }), 500
 
-@app.route('/api/issues/map', methods=['GET'])
-def get_issues_map():
+@app.route('/api/issues/changes', methods=['GET'])
+def stream_issue_changes():
+    """Server-Sent Events feed of issue changes inside a bounding box"""
     try:
         min_lat = float(request.args.get('minLat', 12.8))
         max_lat = float(request.args.get('maxLat', 13.2))
         min_lng = float(request.args.get('minLng', 77.4))
         max_lng = float(request.args.get('maxLng', 77.8))
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Bounding box and lastEventId must be numeric'
+        }), 400
+    
+    subscription = change_feed.subscribe(min_lat, max_lat, min_lng, max_lng, last_event_id)
+    heartbeat = app.config['CHANGE_FEED_HEARTBEAT']
+    
+    def stream():
+        try:
+            yield f'retry: {heartbeat * 1000}\n\n'
+            if subscription.resync:
+                # The gap cannot be replayed; the client should refetch the map and carry on
+                yield f'event: resync\ndata: {{"lastEventId":{change_feed.sequence}}}\n\n'
+            
+            while True:
+                try:
+                    event = subscription.events.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                
+                if event is None:
+                    yield f'event: resync\ndata: {{"lastEventId":{change_feed.sequence}}}\n\n'
+                    return
+                
+                sequence, change, _, _, data = event
+                yield f'id: {sequence}\nevent: {change}\ndata: {data}\n\n'
+        finally:
+            change_feed.unsubscribe(subscription)
+    
+    response = app.response_class(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/tiles/<int:z>/<int:x>/<int:y>', methods=['GET'])
+def get_issue_tile(z, x, y):
+    try:
+        if not tile_renderer.is_valid_tile(z, x, y):
+            return jsonify({'error': 'Tile not found'}), 404
+        
         types = request.args.get('types', '').split(',') if request.args.get('types') else []
         statuses = request.args.get('statuses', '').split(',') if request.args.get('statuses') else []
-        limit = int(request.args.get('limit', 1000))
-        
-        # Build query
-        query = Issue.query.filter(
-            and_(
-                Issue.latitude >= min_lat,
-                Issue.latitude <= max_lat,
-                Issue.longitude >= min_lng,
-                Issue.longitude <= max_lng
-            )
-        )
         
-        if types:
-            query = query.filter(Issue.type.in_(types))
+        body, etag = tile_renderer.get_tile(z, x, y, types, statuses)
         
-        if statuses:
-            query = query.filter(Issue.status.in_(statuses))
+        response = app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
         
-        issues = query.order_by(Issue.priority.desc(), Issue.created_at.desc()).limit(limit).all()
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/work-queue', methods=['GET'])
+def get_work_queue():
+    """Highest priority open issues around a crew, batched into nearby groups"""
+    try:
+        latitude = float(request.args['latitude'])
+        longitude = float(request.args['longitude'])
+        radius = min(float(request.args.get('radius', 5000)), app.config['WORK_QUEUE_MAX_RADIUS'])
+        limit = min(int(request.args.get('limit', 20)), app.config['WORK_QUEUE_MAX_JOBS'])
+    except (KeyError, ValueError):
+        return jsonify({
+            'success': False,
+            'error': 'latitude and longitude are required; radius and limit must be numeric'
+        }), 400
+    
+    try:
+        jobs = work_queue.nearest_jobs(latitude, longitude, radius, max(limit, 1))
+        routes = work_queue.batch_jobs(jobs)
+        
+        # The heaps only hold ids and priorities; details come from one primary key lookup
+        issues = Issue.query.filter(Issue.id.in_([issue_id for issue_id, _, _ in jobs])).all()
+        serialized_issues = {issue['id']: issue for issue in serialize_issues(issues)}
+        
+        batches = []
+        for route in routes:
+            batch_jobs = []
+            for issue_id, _, distance in route:
+                issue = serialized_issues.get(issue_id)
+                if issue is None or issue['status'] not in work_queue.OPEN_STATUSES:
+                    continue  # closed by another worker since the last reload
+                batch_jobs.append(dict(issue, distance=round(distance)))
+            if batch_jobs:
+                batches.append({
+                    'jobs': batch_jobs,
+                    'count': len(batch_jobs),
+                    'totalPriority': round(sum(job['priority'] for job in batch_jobs), 1)
+                })
         
         return jsonify({
             'success': True,
-            'issues': [issue.to_dict() for issue in issues],
-            'count': len(issues)
+            'batches': batches,
+            'count': sum(batch['count'] for batch in batches)
         })
         
     except Exception as e:
@@ -450,30 +2754,344 @@ def upvote_issue(issue_id):
         if not issue:
             return jsonify({'error': 'Issue not found'}), 404
         
-        # Check if user already upvoted
-        if any(user.id == user_id for user in issue.upvoters):
+        if upvote_buffer.enabled:
+            return buffer_upvote(issue, user_id)
+        
+        # Update user stats, which also tells us whether the user exists
+        user_update = db.session.execute(
+            db.update(User)
+            .where(User.id == user_id)
+            .values(upvotes_given=User.upvotes_given + 1, last_active=datetime.utcnow())
+        )
+        if user_update.rowcount == 0:
+            db.session.rollback()
+            return jsonify({
+                'success': True,
+                'message': 'Issue upvoted successfully',
+                'upvotes': issue.upvotes
+            })
+        
+        # The composite primary key rejects a second vote from the same user
+        vote_insert = db.session.execute(
+            dialect_insert(issue_upvotes)
+            .values(issue_id=issue_id, user_id=user_id)
+            .on_conflict_do_nothing()
+        )
+        if vote_insert.rowcount == 0:
+            db.session.rollback()
             return jsonify({'error': 'Already upvoted this issue'}), 400
         
-        # Add upvote
-        user = User.query.get(user_id)
-        if user:
-            issue.upvotes += 1
-            issue.upvoters.append(user)
-            issue.priority = priority_calculator.calculate_priority(issue)
+        # Count the vote and recompute priority atomically, without loading the upvoters
+        upvotes = db.session.execute(
+            db.update(Issue)
+            .where(Issue.id == issue_id)
+            .values(
+                upvotes=Issue.upvotes + 1,
+                base_priority=Issue.base_priority + priority_calculator.UPVOTE_WEIGHT
+            )
+            .returning(Issue.upvotes)
+        ).scalar_one()
+        
+        key, _ = stats_rollup.snapshot(issue)
+        stats_rollup.apply({key: [0, priority_calculator.UPVOTE_WEIGHT, 1, 0]})
+        
+        db.session.commit()
+        notify_issue_changed(issue.id, issue.latitude, issue.longitude)
+        publish_issue_change(issue, 'upvoted')
+        
+        return jsonify({
+            'success': True,
+            'message': 'Issue upvoted successfully',
+            'upvotes': upvotes
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def buffer_upvote(issue, user_id):
+    """Accept an upvote into the write-coalescing buffer instead of committing it"""
+    # Unknown users are not counted, matching the unbuffered path
+    if db.session.get(User, user_id) is None:
+        return jsonify({
+            'success': True,
+            'message': 'Issue upvoted successfully',
+            'upvotes': issue.upvotes + len(upvote_buffer.pending_upvoters(issue.id))
+        })
+    
+    already_upvoted = upvote_buffer.has_pending(issue.id, user_id) or db.session.execute(
+        db.select(issue_upvotes.c.issue_id)
+        .where(issue_upvotes.c.issue_id == issue.id, issue_upvotes.c.user_id == user_id)
+    ).first() is not None
+    
+    if already_upvoted or not upvote_buffer.add(issue.id, user_id):
+        return jsonify({'error': 'Already upvoted this issue'}), 400
+    
+    # Pending votes are merged into reads, so cached responses are outdated now
+    response_cache.bump(issue.id, issue.latitude, issue.longitude)
+    publish_issue_change(issue, 'upvoted')
+    
+    return jsonify({
+        'success': True,
+        'message': 'Issue upvoted successfully',
+        'upvotes': issue.upvotes + len(upvote_buffer.pending_upvoters(issue.id)),
+        'pending': True
+    })
+
+@app.route('/api/issues/<issue_id>/photos', methods=['POST'])
+def upload_photos(issue_id):
+    try:
+        issue = Issue.query.get(issue_id)
+        if not issue:
+            return jsonify({'error': 'Issue not found'}), 404
+        
+        files = request.files.getlist('photos') or request.files.getlist('photo')
+        if not files:
+            return jsonify({'error': 'No photos uploaded'}), 400
+        
+        for file in files:
+            extension = secure_filename(file.filename or '').rsplit('.', 1)[-1].lower()
+            if extension not in app.config['ALLOWED_PHOTO_EXTENSIONS']:
+                return jsonify({
+                    'error': f'Unsupported file type: {file.filename}',
+                    'allowed_extensions': sorted(app.config['ALLOWED_PHOTO_EXTENSIONS'])
+                }), 400
             
-            # Update user stats
-            user.upvotes_given += 1
-            user.last_active = datetime.utcnow()
+            # The extension is only a claim; check the magic bytes like chunked uploads do
+            header = file.stream.read(16)
+            file.stream.seek(0)
+            if detect_image_format(header) is None:
+                return jsonify({'error': f'File is not a supported image: {file.filename}'}), 415
+        
+        # Store the raw uploads and queue them; decoding happens in the process pool
+        queued = []
+        for file in files:
+            stem = str(uuid.uuid4())
+            source_path = os.path.join(app.config['UPLOAD_FOLDER'], f'{stem}.upload')
+            file.save(source_path)
             
-            db.session.commit()
+            photo = Photo(
+                issue_id=issue.id,
+                filename=f'{stem}.jpg',
+                file_path=os.path.join(app.config['UPLOAD_FOLDER'], f'{stem}.jpg'),
+                status='processing'
+            )
+            db.session.add(photo)
+            queued.append((photo, source_path))
+        
+        db.session.commit()
+        
+        for photo, source_path in queued:
+            photo_pipeline.submit(photo.id, source_path)
         
         return jsonify({
             'success': True,
-            'message': 'Issue upvoted successfully',
-            'upvotes': issue.upvotes
+            'message': 'Photos accepted for processing',
+            'photos': [photo.to_dict() for photo, _ in queued]
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/uploads', methods=['POST'])
+def create_upload():
+    try:
+        data = request.get_json()
+        issue_id = data.get('issueId')
+        filename = data.get('filename')
+        total_size = data.get('totalSize')
+        
+        if not issue_id or not filename or not total_size:
+            return jsonify({'error': 'issueId, filename and totalSize are required'}), 400
+        
+        if int(total_size) > app.config['MAX_PHOTO_SIZE']:
+            return jsonify({'error': f"File too large, at most {app.config['MAX_PHOTO_SIZE']} bytes allowed"}), 413
+        
+        extension = secure_filename(filename).rsplit('.', 1)[-1].lower()
+        if extension not in app.config['ALLOWED_PHOTO_EXTENSIONS']:
+            return jsonify({
+                'error': f'Unsupported file type: {filename}',
+                'allowed_extensions': sorted(app.config['ALLOWED_PHOTO_EXTENSIONS'])
+            }), 400
+        
+        if not Issue.query.get(issue_id):
+            return jsonify({'error': 'Issue not found'}), 404
+        
+        upload = UploadSession(issue_id=issue_id, filename=filename, total_size=int(total_size))
+        db.session.add(upload)
+        db.session.commit()
+        open(upload.part_path, 'wb').close()
+        
+        return jsonify({
+            'success': True,
+            'upload': upload.to_dict(),
+            'chunk_size': app.config['UPLOAD_CHUNK_SIZE']
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    upload = db.session.get(UploadSession, upload_id)
+    if not upload:
+        return jsonify({'error': 'Upload not found'}), 404
+    
+    # Clients resume from received_size after a dropped connection
+    return jsonify({
+        'success': True,
+        'upload': upload.to_dict()
+    })
+
+@app.route('/api/uploads/<upload_id>', methods=['PUT'])
+def upload_chunk(upload_id):
+    try:
+        upload = db.session.get(UploadSession, upload_id)
+        if not upload:
+            return jsonify({'error': 'Upload not found'}), 404
+        
+        if upload.status != 'uploading':
+            return jsonify({'error': 'Upload already completed'}), 409
+        
+        offset = int(request.args.get('offset', upload.received_size))
+        if offset != upload.received_size:
+            return jsonify({
+                'error': 'Chunk does not continue the upload',
+                'received_size': upload.received_size
+            }), 409
+        
+        # Stream the chunk to disk through a fixed-size buffer
+        buffer_size = app.config['UPLOAD_BUFFER_SIZE']
+        received_size = upload.received_size
+        with open(upload.part_path, 'r+b') as part:
+            part.seek(received_size)
+            part.truncate()
+            while True:
+                buffer = request.stream.read(buffer_size)
+                if not buffer:
+                    break
+                if received_size + len(buffer) > upload.total_size:
+                    return jsonify({'error': 'Chunk exceeds the declared file size'}), 413
+                part.write(buffer)
+                received_size += len(buffer)
+                
+                # Reject non-images as soon as enough of the header has arrived
+                if upload.image_format is None:
+                    error = validate_upload_header(upload, part, received_size)
+                    if error:
+                        return error
+        
+        upload.received_size = received_size
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'upload': upload.to_dict()
         })
         
     except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def validate_upload_header(upload, part, received_size):
+    """Check magic bytes and dimensions once enough of the header is on disk, returning an error response"""
+    probe_size = min(app.config['UPLOAD_HEADER_PROBE_SIZE'], upload.total_size)
+    if received_size < probe_size:
+        return None
+    
+    part.flush()
+    with open(upload.part_path, 'rb') as header_file:
+        header = header_file.read(16)
+    
+    image_format = detect_image_format(header)
+    if image_format is None:
+        discard_upload(upload)
+        return jsonify({'error': 'File is not a supported image'}), 415
+    
+    try:
+        width, height = read_image_dimensions(upload.part_path)
+    except Exception:
+        # ICC, EXIF and MPF segments can push the frame header past the first probe
+        if received_size < min(app.config['UPLOAD_HEADER_MAX_PROBE_SIZE'], upload.total_size):
+            return None
+        discard_upload(upload)
+        return jsonify({'error': 'Unreadable image header'}), 415
+    
+    if width * height > app.config['MAX_PHOTO_PIXELS']:
+        discard_upload(upload)
+        return jsonify({'error': f'Image dimensions too large: {width}x{height}'}), 413
+    
+    upload.image_format = image_format
+    upload.width = width
+    upload.height = height
+    return None
+
+def discard_upload(upload):
+    """Delete a rejected upload and its partial file"""
+    if os.path.exists(upload.part_path):
+        os.remove(upload.part_path)
+    db.session.delete(upload)
+    db.session.commit()
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload(upload_id):
+    try:
+        upload = db.session.get(UploadSession, upload_id)
+        if not upload:
+            return jsonify({'error': 'Upload not found'}), 404
+        
+        if upload.status != 'uploading':
+            return jsonify({'error': 'Upload already completed'}), 409
+        
+        if upload.received_size != upload.total_size or upload.image_format is None:
+            return jsonify({
+                'error': 'Upload is incomplete',
+                'received_size': upload.received_size,
+                'total_size': upload.total_size
+            }), 400
+        
+        # The chunks were appended in place, so assembling the file is a rename
+        stem = str(uuid.uuid4())
+        source_path = os.path.join(app.config['UPLOAD_FOLDER'], f'{stem}.upload')
+        os.replace(upload.part_path, source_path)
+        
+        photo = Photo(
+            issue_id=upload.issue_id,
+            filename=f'{stem}.jpg',
+            file_path=os.path.join(app.config['UPLOAD_FOLDER'], f'{stem}.jpg'),
+            status='processing'
+        )
+        db.session.add(photo)
+        db.session.flush()
+        upload.photo_id = photo.id
+        upload.status = 'complete'
+        db.session.commit()
+        
+        photo_pipeline.submit(photo.id, source_path)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Photo accepted for processing',
+            'upload': upload.to_dict(),
+            'photo': photo.to_dict()
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
         return jsonify({
             'success': False,
             'error': str(e)
@@ -498,6 +3116,7 @@ def update_issue_status(issue_id):
         if not issue:
             return jsonify({'error': 'Issue not found'}), 404
         
+        before = stats_rollup.snapshot(issue)
         issue.status = status
         
         if status == 'verified' and verified_by:
@@ -510,7 +3129,10 @@ def update_issue_status(issue_id):
         if estimated_repair_time:
             issue.estimated_repair_time = int(estimated_repair_time)
         
+        stats_rollup.record(before, stats_rollup.snapshot(issue))
         db.session.commit()
+        notify_issue_changed(issue.id, issue.latitude, issue.longitude)
+        publish_issue_change(issue, 'status')
         
         return jsonify({
             'success': True,
@@ -525,6 +3147,7 @@ def update_issue_status(issue_id):
         }), 500
 
 @app.route('/api/issues/stats', methods=['GET'])
+@cached_response(lambda: ['global'], vary=lambda: datetime.utcnow().date().isoformat())
 def get_stats():
     try:
         ward = request.args.get('ward')
@@ -532,54 +3155,10 @@ def get_stats():
         
         time_threshold = datetime.utcnow() - timedelta(days=time_range)
         
-        # Build query
-        query = Issue.query.filter(Issue.created_at >= time_threshold)
-        if ward:
-            query = query.filter(Issue.ward == ward)
-        
-        issues = query.all()
-        
-        if not issues:
-            return jsonify({
-                'success': True,
-                'stats': {
-                    'totalIssues': 0,
-                    'avgPriority': 0,
-                    'avgUpvotes': 0,
-                    'avgRepairTime': 0,
-                    'typeBreakdown': {},
-                    'severityBreakdown': {},
-                    'statusBreakdown': {}
-                }
-            })
-        
-        # Calculate statistics
-        total_issues = len(issues)
-        avg_priority = sum(issue.priority for issue in issues) / total_issues
-        avg_upvotes = sum(issue.upvotes for issue in issues) / total_issues
-        avg_repair_time = sum(issue.estimated_repair_time or 0 for issue in issues) / total_issues
-        
-        # Breakdowns
-        type_breakdown = {}
-        severity_breakdown = {}
-        status_breakdown = {}
-        
-        for issue in issues:
-            type_breakdown[issue.type] = type_breakdown.get(issue.type, 0) + 1
-            severity_breakdown[issue.severity] = severity_breakdown.get(issue.severity, 0) + 1
-            status_breakdown[issue.status] = status_breakdown.get(issue.status, 0) + 1
-        
+        # Sum the pre-aggregated rollup rows instead of loading every issue
         return jsonify({
             'success': True,
-            'stats': {
-                'totalIssues': total_issues,
-                'avgPriority': round(avg_priority, 1),
-                'avgUpvotes': round(avg_upvotes, 1),
-                'avgRepairTime': round(avg_repair_time, 1),
-                'typeBreakdown': type_breakdown,
-                'severityBreakdown': severity_breakdown,
-                'statusBreakdown': status_breakdown
-            }
+            'stats': stats_rollup.summarize(time_threshold, ward)
         })
         
     except Exception as e:
@@ -589,6 +3168,7 @@ def get_stats():
         }), 500
 
 @app.route('/api/issues/<issue_id>', methods=['GET'])
+@cached_response(lambda issue_id: [f'issue:{issue_id}'])
 def get_issue(issue_id):
     try:
         issue = Issue.query.get(issue_id)
@@ -597,7 +3177,7 @@ def get_issue(issue_id):
         
         return jsonify({
             'success': True,
-            'issue': issue.to_dict()
+            'issue': serialize_issues([issue])[0]
         })
         
     except Exception as e:
@@ -606,9 +3186,66 @@ def get_issue(issue_id):
             'error': str(e)
         }), 500
 
+# Photo files named by their sha256, e.g. <hash>.jpg or <hash>_thumbnail.jpg
+CONTENT_HASHED_FILENAME = re.compile(r'^([0-9a-f]{64})(_[a-z]+)?\.jpg$')
+
 @app.route('/uploads/<filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    content_hashed = CONTENT_HASHED_FILENAME.match(filename)
+    
+    # Let a front proxy stream the file so workers are freed immediately
+    if app.config['UPLOADS_ACCEL_REDIRECT']:
+        if not os.path.isfile(os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(filename))):
+            return jsonify({'error': 'File not found'}), 404
+        response = app.response_class()
+        response.headers['X-Accel-Redirect'] = app.config['UPLOADS_ACCEL_REDIRECT'] + secure_filename(filename)
+        if content_hashed:
+            response.headers['Cache-Control'] = f"public, max-age={app.config['UPLOADS_MAX_AGE']}, immutable"
+        return response
+    
+    if not content_hashed:
+        return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    
+    # The name already identifies the bytes: strong ETag, immutable caching, Range support
+    response = send_from_directory(
+        app.config['UPLOAD_FOLDER'],
+        filename,
+        etag=filename.rsplit('.', 1)[0],
+        max_age=app.config['UPLOADS_MAX_AGE'],
+        conditional=True
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+def admin_error():
+    """Return an error response unless the request carries the configured admin token"""
+    token = app.config['ADMIN_TOKEN']
+    if not token:
+        return jsonify({'success': False, 'error': 'Admin endpoints are disabled until ADMIN_TOKEN is set'}), 403
+    if request.headers.get('X-Admin-Token') != token:
+        return jsonify({'success': False, 'error': 'Admin token required'}), 403
+    return None
+
+@app.route('/api/admin/priorities/refresh', methods=['GET', 'POST'])
+def refresh_priorities():
+    """Report priority scheduler progress, or trigger a full recomputation"""
+    error = admin_error()
+    if error:
+        return error
+    
+    if request.method == 'POST':
+        priority_scheduler.request_run(full=True)
+        return jsonify({
+            'success': True,
+            'message': 'Full priority refresh scheduled',
+            'scheduler': priority_scheduler.status()
+        }), 202
+    
+    return jsonify({
+        'success': True,
+        'scheduler': priority_scheduler.status()
+    })
 
 @app.route('/health')
 def health_check():
@@ -618,10 +3255,67 @@ def health_check():
         'uptime': 'N/A'
     })
 
+def upgrade_schema():
+    """Add the columns and indexes that create_all skips on tables from an older schema"""
+    added_columns = set()
+    
+    with db.engine.begin() as connection:
+        inspector = inspect(connection)
+        for table in db.metadata.sorted_tables:
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(connection.dialect)}'
+                if column.default is not None and column.default.is_scalar:
+                    default = literal(column.default.arg).compile(
+                        dialect=connection.dialect, compile_kwargs={'literal_binds': True}
+                    )
+                    ddl += f' DEFAULT {default}'
+                    if not column.nullable:
+                        ddl += ' NOT NULL'
+                connection.execute(text(ddl))
+                added_columns.add(f'{table.name}.{column.name}')
+            
+            for index in table.indexes:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+        
+        # Priority ordering uses ix_issues_priority; the old column index only slowed writes
+        if 'ix_issues_base_priority' in {index['name'] for index in inspector.get_indexes('issues')}:
+            connection.execute(text('DROP INDEX ix_issues_base_priority'))
+        
+        # The old stored priority mixed in an age bonus frozen at write time, so
+        # both parts are recomputed from their inputs rather than copied from it
+        issues = Issue.__table__
+        if 'issues.base_priority' in added_columns:
+            connection.execute(issues.update().values(
+                base_priority=priority_calculator.base_priority_expression(issues.c),
+                updated_at=issues.c.updated_at
+            ))
+        if 'issues.age_bonus' in added_columns:
+            connection.execute(issues.update().values(
+                age_bonus=priority_calculator.age_bonus_expression(issues.c.created_at),
+                updated_at=issues.c.updated_at
+            ))
+    
+    return added_columns
+
 # Initialize database
 def init_db():
     with app.app_context():
         db.create_all()
+        added_columns = upgrade_schema()
+        if added_columns:
+            print(f"🔧 Added columns: {', '.join(sorted(added_columns))}")
+        spatial_index.setup()
+        
+        # Backfill grid cells for issues created before the spatial index existed
+        unindexed_issues = Issue.query.filter(Issue.grid_cell.is_(None)).all()
+        for issue in unindexed_issues:
+            issue.grid_cell = spatial_grid.cell_for(issue.latitude, issue.longitude)
+        if unindexed_issues:
+            db.session.commit()
         
         # Create sample data if database is empty
         if User.query.count() == 0:
@@ -667,16 +3361,24 @@ def init_db():
             
             for issue_data in sample_issues:
                 issue = Issue(**issue_data)
-                issue.priority = priority_calculator.calculate_priority(issue)
+                issue.base_priority = priority_calculator.calculate_base_priority(issue)
                 db.session.add(issue)
             
             db.session.commit()
             print("✅ Sample data created successfully!")
+        
+        # Build the statistics rollup for databases that predate it
+        if IssueStatsRollup.query.first() is None and Issue.query.first() is not None:
+            stats_rollup.rebuild()
+            db.session.commit()
+    
+    # Bring age bonuses up to date, then keep them current in the background
+    priority_scheduler.start()
 
 if __name__ == '__main__':
     print("🚀 Starting Pothole Reporting System - Python Backend...")
     print("📍 Server will be available at: http://localhost:5000")
-    print("🗄️  Database: SQLite (pothole_reporting.db)")
+    print(f"🗄️  Database: {make_url(app.config['SQLALCHEMY_DATABASE_URI']).render_as_string(hide_password=True)}")
     print("🔄 Initializing database...")
     
     init_db()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+SQLite storage profile benchmark for the Pothole Reporting System
+Map read throughput while reports are being written, per SQLITE_PROFILE
+
+Each reader and writer is its own process with its own copy of the app, all
+sharing one database file, like the workers of a multi-process server: they
+contend for SQLite's file locks rather than for one interpreter's GIL.
+Readers request /api/issues/map with a slightly different bounding box each
+time, so the response cache cannot answer for the database, while writers
+file new reports. app.py reads its configuration at import time, so every
+process gets the profile through the environment.
+
+Usage: python bench_sqlite_profile.py [seconds] [readers] [writers]
+"""
+
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILES = ('default', 'production')
+SEED_ISSUES = 5000
+STARTUP_GRACE = 5.0  # seconds for every process to import the app before the clock starts
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def load_app():
+    sys.path.insert(0, REPO_DIR)
+    import app as backend
+    return backend
+
+
+def seed_database():
+    """Create the schema and the seeded issues; prints the reporter id"""
+    backend = load_app()
+    random.seed(7)
+    with backend.app.app_context():
+        backend.db.create_all()
+        backend.spatial_index.setup()
+        reporter = backend.User(username='bench', email='bench@example.com')
+        backend.db.session.add(reporter)
+        backend.db.session.commit()
+        for _ in range(SEED_ISSUES):
+            issue = backend.Issue(
+                type=random.choice(['pothole', 'road_construction', 'road_closure']),
+                latitude=random.uniform(12.8, 13.2), longitude=random.uniform(77.4, 77.8),
+                address='Bangalore', description='Seeded issue', reporter_id=reporter.id,
+                severity=random.choice(['low', 'medium', 'high', 'critical'])
+            )
+            issue.base_priority = backend.priority_calculator.calculate_base_priority(issue)
+            backend.db.session.add(issue)
+        backend.db.session.commit()
+        print(reporter.id)
+
+
+def run_worker(role, seed, reporter_id, start_at, seconds):
+    """Issue reads or writes from start_at for some seconds; prints the latencies as a JSON line"""
+    backend = load_app()
+    client, rng = backend.app.test_client(), random.Random(seed)
+    latencies, errors = [], 0
+
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = start_at + seconds
+    while time.time() < deadline:
+        started = time.perf_counter()
+        if role == 'reader':
+            lat, lng = rng.uniform(12.85, 13.1), rng.uniform(77.45, 77.7)
+            response = client.get(f'/api/issues/map?view=marker&limit=200&minLat={lat:.5f}&maxLat={lat + 0.05:.5f}'
+                                  f'&minLng={lng:.5f}&maxLng={lng + 0.05:.5f}')
+            errors += response.status_code != 200
+        else:
+            response = client.post('/api/issues/report', json={
+                'type': 'pothole', 'latitude': rng.uniform(12.8, 13.2), 'longitude': rng.uniform(77.4, 77.8),
+                'address': 'Bangalore', 'description': f'Bench report {rng.random()}',
+                'severity': 'medium', 'reporter_id': reporter_id
+            })
+            errors += response.status_code not in (200, 201)
+        latencies.append(time.perf_counter() - started)
+
+    print(json.dumps({'role': role, 'latencies': latencies, 'errors': errors}))
+
+
+def run_profile(profile, seconds, readers, writers):
+    """Seed a fresh database, then run reader and writer processes against it together"""
+    work_dir = tempfile.mkdtemp(prefix=f'bench-sqlite-{profile}-')
+    environment = dict(
+        os.environ,
+        SQLITE_PROFILE=profile,
+        DATABASE_URL='sqlite:///' + os.path.join(work_dir, 'bench.db'),
+        PRIORITY_SCHEDULER_ENABLED='0'
+    )
+    environment.pop('RESPONSE_CACHE_PATH', None)
+    script = os.path.abspath(__file__)
+
+    reporter_id = subprocess.run(
+        [sys.executable, script, '--seed'], cwd=work_dir, env=environment,
+        capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+
+    start_at = time.time() + STARTUP_GRACE
+    roles = ['reader'] * readers + ['writer'] * writers
+    processes = [
+        subprocess.Popen(
+            [sys.executable, script, '--worker', role, str(index), reporter_id, repr(start_at), str(seconds)],
+            cwd=work_dir, env=environment, stdout=subprocess.PIPE, text=True
+        )
+        for index, role in enumerate(roles)
+    ]
+
+    latencies = {'reader': [], 'writer': []}
+    errors = {'reader': 0, 'writer': 0}
+    for process in processes:
+        output, _ = process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f'{profile} worker exited with {process.returncode}')
+        result = json.loads(output.strip().splitlines()[-1])
+        latencies[result['role']].extend(result['latencies'])
+        errors[result['role']] += result['errors']
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        'reads_per_second': len(latencies['reader']) / seconds,
+        'read_p95_ms': percentile(latencies['reader'], 0.95) * 1000,
+        'read_errors': errors['reader'],
+        'writes_per_second': len(latencies['writer']) / seconds,
+        'write_p95_ms': percentile(latencies['writer'], 0.95) * 1000,
+        'write_errors': errors['writer']
+    }
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--seed':
+        seed_database()
+        sys.exit()
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        run_worker(sys.argv[2], int(sys.argv[3]), sys.argv[4], float(sys.argv[5]), float(sys.argv[6]))
+        sys.exit()
+
+    seconds, readers, writers = (float(sys.argv[1]) if len(sys.argv) > 1 else 10.0,
+                                 int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+                                 int(sys.argv[3]) if len(sys.argv) > 3 else 2)
+    print(f'{readers} map reader and {writers} report writer processes, {seconds:g} s per profile, '
+          f'{SEED_ISSUES} seeded issues')
+    print(f"{'profile':<12}{'reads/s':>10}{'read p95 ms':>14}{'read err':>10}"
+          f"{'writes/s':>10}{'write p95 ms':>14}{'write err':>11}")
+    for profile in PROFILES:
+        result = run_profile(profile, seconds, readers, writers)
+        print(f"{profile:<12}{result['reads_per_second']:>10.1f}{result['read_p95_ms']:>14.1f}{result['read_errors']:>10}"
+              f"{result['writes_per_second']:>10.1f}{result['write_p95_ms']:>14.1f}{result['write_errors']:>11}")
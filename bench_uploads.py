@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Upload serving benchmark for the Pothole Reporting System
+Worker time taken by the photo requests of one map page with 50 popups
+
+Worker occupancy is the handler time measured here plus, when the worker
+streams the body itself, the time a client needs to download it. By Little's
+law, occupancy per page view times page views per second is the number of
+workers the photos keep busy.
+
+Scenarios:
+  legacy          uuid names, no caching headers: every view refetches every photo
+  hashed, first   content-hashed names, empty browser cache
+  hashed, 304     content-hashed names, browser revalidates with If-None-Match
+  hashed, cached  content-hashed names, immutable entries served from the browser cache
+  accel redirect  UPLOADS_ACCEL_REDIRECT set: nginx streams the bytes
+
+Usage: python bench_uploads.py [client_mbit_per_s] [page_views_per_s]
+"""
+
+import hashlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+PHOTOS_PER_PAGE = 50
+
+
+def make_photos(upload_folder, count):
+    """Write noisy JPEGs under both a legacy uuid name and a content-hashed name"""
+    from PIL import Image
+
+    random.seed(7)
+    legacy_names, hashed_names = [], []
+    for _ in range(count):
+        image = Image.frombytes('RGB', (640, 480), random.randbytes(640 * 480 * 3))
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=85)
+        data = buffer.getvalue()
+        names = (f'{uuid.uuid4()}.jpg', f'{hashlib.sha256(data).hexdigest()}.jpg')
+        for name in names:
+            with open(os.path.join(upload_folder, name), 'wb') as photo:
+                photo.write(data)
+        legacy_names.append(names[0])
+        hashed_names.append(names[1])
+    return legacy_names, hashed_names
+
+
+def load_page(client, names, headers_for, bandwidth, streams_body=True):
+    """Fetch one page's photos, returning (requests, bytes through the worker, worker seconds)"""
+    requests = body_bytes = 0
+    occupancy = 0.0
+    for name in names:
+        headers = headers_for(name)
+        if headers is None:
+            continue
+        started = time.perf_counter()
+        response = client.get(f'/uploads/{name}', headers=headers)
+        body = response.get_data()
+        if response.status_code not in (200, 304):
+            raise RuntimeError(f'/uploads/{name} returned {response.status_code}')
+        occupancy += time.perf_counter() - started
+        requests += 1
+        if streams_body:
+            body_bytes += len(body)
+            occupancy += len(body) / bandwidth
+    return requests, body_bytes, occupancy
+
+
+if __name__ == '__main__':
+    mbit_per_s = float(sys.argv[1]) if len(sys.argv) > 1 else 20.0
+    page_views = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    bandwidth = mbit_per_s * 1e6 / 8  # bytes per second
+
+    work_dir = tempfile.mkdtemp(prefix='bench-uploads-')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(work_dir, 'bench.db')
+    os.environ['PRIORITY_SCHEDULER_ENABLED'] = '0'
+    os.chdir(work_dir)
+    sys.path.insert(0, REPO_DIR)
+    import app as backend
+
+    # send_from_directory resolves relative folders against the app root, not the working directory
+    backend.app.config['UPLOAD_FOLDER'] = os.path.join(work_dir, 'uploads')
+    os.makedirs(backend.app.config['UPLOAD_FOLDER'], exist_ok=True)
+    legacy_names, hashed_names = make_photos(backend.app.config['UPLOAD_FOLDER'], PHOTOS_PER_PAGE)
+    etag = {name: f'"{name.rsplit(".", 1)[0]}"' for name in hashed_names}
+    client = backend.app.test_client()
+
+    scenarios = [
+        ('legacy', legacy_names, lambda name: {}),
+        ('hashed, first', hashed_names, lambda name: {}),
+        ('hashed, 304', hashed_names, lambda name: {'If-None-Match': etag[name]}),
+        ('hashed, cached', hashed_names, lambda name: None),
+    ]
+    results = [(label, load_page(client, names, headers_for, bandwidth))
+               for label, names, headers_for in scenarios]
+
+    backend.app.config['UPLOADS_ACCEL_REDIRECT'] = '/protected-uploads/'
+    results.append(('accel redirect', load_page(client, hashed_names, lambda name: {}, bandwidth, False)))
+
+    print(f'{PHOTOS_PER_PAGE} photos per page, clients at {mbit_per_s:g} Mbit/s, {page_views:g} page views/s')
+    print(f"{'scenario':<16}{'requests':>10}{'KiB via worker':>16}{'worker ms/page':>16}{'busy workers':>14}")
+    for label, (requests, body_bytes, occupancy) in results:
+        print(f'{label:<16}{requests:>10}{body_bytes / 1024:>16.0f}{occupancy * 1000:>16.1f}{occupancy * page_views:>14.2f}')
+
+    shutil.rmtree(work_dir, ignore_errors=True)
@@ -10,12 +10,369 @@ import json
 import uuid
 from datetime import datetime
 import math
+import os
+import queue
+import threading
+import time
+import mmap
+import struct
+from array import array
 
 app = Flask(__name__)
 CORS(app)
 
+# Directory for snapshots and the report journal; set DEMO_DATA_DIR to '' to keep everything in memory only
+DEMO_DATA_DIR = os.environ.get('DEMO_DATA_DIR', 'demo_data')
+DEMO_SNAPSHOT_INTERVAL = int(os.environ.get('DEMO_SNAPSHOT_INTERVAL', 300))  # seconds
+
+class IssueStore:
+    """In-memory issues kept as typed columns with a uniform grid index"""
+    
+    CELL_SIZE = 0.01  # degrees per grid cell
+    MAX_GRID_CELLS = 4096  # larger boxes scan the coordinate columns instead
+    
+    # Snapshot layout: header, aggregates as JSON, the four columns, record
+    # offsets, then the JSON-encoded records. Columns use native byte order.
+    SNAPSHOT_MAGIC = b'PHSNAP01'
+    SNAPSHOT_HEADER = struct.Struct('<8sQQ')  # magic, issue count, aggregates length
+    
+    def __init__(self):
+        self.latitudes = array('d')
+        self.longitudes = array('d')
+        self.priorities = array('d')
+        self.upvotes = array('q')
+        self.records = []
+        self.grid = {}  # (row, col) -> array of record positions
+        self.lock = threading.RLock()
+        
+        # Records loaded from a snapshot stay encoded in the mapped file until first read
+        self.snapshot = None
+        self.snapshot_offsets = array('q')
+        self.snapshot_blob_start = 0
+        
+        # Running aggregates for the stats endpoint
+        self.priority_total = 0.0
+        self.upvote_total = 0
+        self.type_counts = {}
+        self.severity_counts = {}
+        self.status_counts = {}
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def cell_for(self, lat, lng):
+        return (math.floor(lat / self.CELL_SIZE), math.floor(lng / self.CELL_SIZE))
+    
+    def column_values(self, issue):
+        """Convert an issue's column values up front, so a bad issue never lands in only some columns"""
+        try:
+            lng, lat = issue['location']['coordinates']
+            lat, lng = float(lat), float(lng)
+            priority, upvotes = float(issue['priority']), int(issue['upvotes'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('Issue needs numeric coordinates, priority and upvotes')
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValueError(f'Coordinates out of range: {lat}, {lng}')
+        return lat, lng, priority, upvotes
+    
+    def add(self, issue):
+        lat, lng, priority, upvotes = self.column_values(issue)
+        
+        with self.lock:
+            position = len(self.records)
+            self.latitudes.append(lat)
+            self.longitudes.append(lng)
+            self.priorities.append(priority)
+            self.upvotes.append(upvotes)
+            self.records.append(issue)
+            self.grid.setdefault(self.cell_for(lat, lng), array('q')).append(position)
+            
+            self.priority_total += priority
+            self.upvote_total += upvotes
+            for counts, key in ((self.type_counts, 'type'), (self.severity_counts, 'severity'), (self.status_counts, 'status')):
+                counts[issue[key]] = counts.get(issue[key], 0) + 1
+        
+        return position
+    
+    def extend(self, issues):
+        for issue in issues:
+            self.add(issue)
+    
+    def record(self, position):
+        """Return the issue at a position, decoding it from the snapshot on first access"""
+        issue = self.records[position]
+        if issue is None:
+            start = self.snapshot_blob_start + self.snapshot_offsets[position]
+            end = self.snapshot_blob_start + self.snapshot_offsets[position + 1]
+            issue = self.records[position] = json.loads(self.snapshot[start:end])
+        return issue
+    
+    def encoded_record(self, position, issue):
+        """Return the JSON encoding of an issue without decoding snapshot records"""
+        if issue is None:
+            start = self.snapshot_blob_start + self.snapshot_offsets[position]
+            end = self.snapshot_blob_start + self.snapshot_offsets[position + 1]
+            return self.snapshot[start:end]
+        return json.dumps(issue).encode('utf-8')
+    
+    def within_bbox(self, min_lat, max_lat, min_lng, max_lng):
+        """Return the issues inside a bounding box, in insertion order"""
+        min_row, min_col = self.cell_for(min_lat, min_lng)
+        max_row, max_col = self.cell_for(max_lat, max_lng)
+        
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > self.MAX_GRID_CELLS:
+            candidates = range(len(self.records))
+        else:
+            candidates = sorted(
+                position
+                for row in range(min_row, max_row + 1)
+                for col in range(min_col, max_col + 1)
+                for position in self.grid.get((row, col), ())
+            )
+        
+        latitudes, longitudes = self.latitudes, self.longitudes
+        return [
+            self.record(position) for position in candidates
+            if min_lat <= latitudes[position] <= max_lat and min_lng <= longitudes[position] <= max_lng
+        ]
+    
+    def stats(self):
+        total = len(self.records)
+        return {
+            "totalIssues": total,
+            "avgPriority": round(self.priority_total / total, 1) if total > 0 else 0,
+            "avgUpvotes": round(self.upvote_total / total, 1) if total > 0 else 0,
+            "typeBreakdown": dict(self.type_counts),
+            "severityBreakdown": dict(self.severity_counts),
+            "statusBreakdown": dict(self.status_counts)
+        }
+    
+    def capture(self):
+        """Copy the columns and record references a snapshot needs; cheap enough to hold the lock"""
+        with self.lock:
+            count = len(self.records)
+            columns = [column[:count] for column in (self.latitudes, self.longitudes, self.priorities, self.upvotes)]
+            aggregates = json.dumps({
+                "priorityTotal": self.priority_total,
+                "upvoteTotal": self.upvote_total,
+                "typeCounts": self.type_counts,
+                "severityCounts": self.severity_counts,
+                "statusCounts": self.status_counts
+            }).encode('utf-8')
+            return count, columns, self.records[:count], aggregates
+    
+    def write_snapshot(self, path, captured):
+        """Write a captured state to a binary snapshot file, atomically"""
+        count, columns, records, aggregates = captured
+        encoded = [self.encoded_record(position, issue) for position, issue in enumerate(records)]
+        
+        offsets = array('q', [0])
+        for record in encoded:
+            offsets.append(offsets[-1] + len(record))
+        
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'wb') as snapshot_file:
+            snapshot_file.write(self.SNAPSHOT_HEADER.pack(self.SNAPSHOT_MAGIC, count, len(aggregates)))
+            snapshot_file.write(aggregates)
+            for column in columns:
+                column.tofile(snapshot_file)
+            offsets.tofile(snapshot_file)
+            snapshot_file.writelines(encoded)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temporary_path, path)
+    
+    @classmethod
+    def load_snapshot(cls, path):
+        """Map a snapshot file into a new store; records are decoded lazily"""
+        with open(path, 'rb') as snapshot_file:
+            snapshot = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, count, aggregates_length = cls.SNAPSHOT_HEADER.unpack_from(snapshot, 0)
+        if magic != cls.SNAPSHOT_MAGIC:
+            raise ValueError(f'{path} is not an issue snapshot')
+        
+        store = cls()
+        position = cls.SNAPSHOT_HEADER.size
+        aggregates = json.loads(snapshot[position:position + aggregates_length])
+        position += aggregates_length
+        
+        for column, length in ((store.latitudes, count), (store.longitudes, count), (store.priorities, count),
+                               (store.upvotes, count), (store.snapshot_offsets, count + 1)):
+            end = position + length * column.itemsize
+            column.frombytes(snapshot[position:end])
+            position = end
+        
+        if position + store.snapshot_offsets[-1] > len(snapshot):
+            raise ValueError(f'{path} is truncated')
+        
+        store.snapshot = snapshot
+        store.snapshot_blob_start = position
+        store.records = [None] * count
+        
+        grid = store.grid
+        for index, (lat, lng) in enumerate(zip(store.latitudes, store.longitudes)):
+            cell = (math.floor(lat / cls.CELL_SIZE), math.floor(lng / cls.CELL_SIZE))
+            cell_positions = grid.get(cell)
+            if cell_positions is None:
+                cell_positions = grid[cell] = array('q')
+            cell_positions.append(index)
+        
+        store.priority_total = aggregates['priorityTotal']
+        store.upvote_total = aggregates['upvoteTotal']
+        store.type_counts = aggregates['typeCounts']
+        store.severity_counts = aggregates['severityCounts']
+        store.status_counts = aggregates['statusCounts']
+        return store
+
+class StorePersistence:
+    """Generational snapshots of an IssueStore plus an append-only journal of reports
+    
+    snapshot.<n>.bin holds every issue journaled before generation n and
+    journal.<n>.log the reports written since. Taking a snapshot moves writes to
+    the next generation first, so a crash at any point leaves a snapshot and
+    the journals needed to bring it up to date.
+    """
+    
+    JOURNAL_RECORD = struct.Struct('<I')  # length prefix of each journaled issue
+    
+    def __init__(self, data_dir, snapshot_interval):
+        self.DATA_DIR = data_dir
+        self.SNAPSHOT_INTERVAL = snapshot_interval
+        self.generation = 0
+        self.journal = None
+        self.writes_since_snapshot = 0
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+    
+    def path(self, kind, generation):
+        extension = 'bin' if kind == 'snapshot' else 'log'
+        return os.path.join(self.DATA_DIR, f'{kind}.{generation}.{extension}')
+    
+    def generations(self, kind):
+        found = []
+        for name in os.listdir(self.DATA_DIR):
+            parts = name.split('.')
+            if len(parts) == 3 and parts[0] == kind and parts[1].isdigit():
+                found.append(int(parts[1]))
+        return sorted(found)
+    
+    def open(self, seed_issues):
+        """Load the newest snapshot, then replay the journals in the background"""
+        os.makedirs(self.DATA_DIR, exist_ok=True)
+        
+        store = None
+        snapshot_generation = 0
+        for generation in reversed(self.generations('snapshot')):
+            try:
+                store = IssueStore.load_snapshot(self.path('snapshot', generation))
+                snapshot_generation = generation
+                break
+            except (OSError, ValueError, struct.error) as e:
+                print(f"⚠️  Skipping unreadable snapshot {generation}: {e}")
+        
+        journals = [generation for generation in self.generations('journal') if generation >= snapshot_generation]
+        self.generation = max(journals + [snapshot_generation])
+        
+        # Reports appended after a torn record would be unreachable on the next replay
+        current_path = self.path('journal', self.generation)
+        if os.path.exists(current_path):
+            complete = self.complete_length(current_path)
+            if complete < os.path.getsize(current_path):
+                print(f"⚠️  Truncating torn record at the end of {current_path}")
+                os.truncate(current_path, complete)
+        self.journal = open(current_path, 'ab')
+        
+        if store is None and not journals:
+            store = IssueStore()
+            for issue in seed_issues:
+                self.append(store, issue)
+            self.ready.set()
+            return store
+        
+        store = store or IssueStore()
+        
+        # Only replay what was on disk before this process started writing
+        pending = [(self.path('journal', generation), os.path.getsize(self.path('journal', generation)))
+                   for generation in journals]
+        threading.Thread(target=self.replay, args=(store, pending), daemon=True).start()
+        return store
+    
+    def complete_length(self, path):
+        """Byte length of the complete records at the start of a journal"""
+        size = os.path.getsize(path)
+        position = 0
+        with open(path, 'rb') as journal:
+            while position + self.JOURNAL_RECORD.size <= size:
+                length, = self.JOURNAL_RECORD.unpack(journal.read(self.JOURNAL_RECORD.size))
+                if position + self.JOURNAL_RECORD.size + length > size:
+                    break
+                journal.seek(length, os.SEEK_CUR)
+                position += self.JOURNAL_RECORD.size + length
+        return position
+    
+    def replay(self, store, journals):
+        try:
+            for path, size in journals:
+                with open(path, 'rb') as journal:
+                    position = 0
+                    while position + self.JOURNAL_RECORD.size <= size:
+                        length, = self.JOURNAL_RECORD.unpack(journal.read(self.JOURNAL_RECORD.size))
+                        payload = journal.read(length)
+                        if len(payload) < length:
+                            break  # torn write at the end of the journal
+                        position += self.JOURNAL_RECORD.size + length
+                        try:
+                            store.add(json.loads(payload))
+                        except ValueError as e:
+                            print(f"⚠️  Skipping bad journal record in {path}: {e}")
+        finally:
+            # Snapshots wait for this; a failed replay must not stop them for good
+            self.ready.set()
+    
+    def append(self, store, issue):
+        """Journal a report, then apply it to the store"""
+        # Only journal what the store accepts, with coordinates in the form it stores them
+        lat, lng, _, _ = store.column_values(issue)
+        issue['location']['coordinates'] = [lng, lat]
+        payload = json.dumps(issue).encode('utf-8')
+        with self.lock:
+            self.journal.write(self.JOURNAL_RECORD.pack(len(payload)) + payload)
+            self.journal.flush()
+            self.writes_since_snapshot += 1
+            store.add(issue)
+    
+    def take_snapshot(self, store):
+        """Snapshot the store and drop the files it supersedes"""
+        if not self.ready.is_set():
+            return
+        
+        # Switch journals and capture the store together, so every report lands in exactly one of them
+        with self.lock:
+            self.journal.close()
+            self.generation += 1
+            self.journal = open(self.path('journal', self.generation), 'ab')
+            self.writes_since_snapshot = 0
+            captured = store.capture()
+        
+        store.write_snapshot(self.path('snapshot', self.generation), captured)
+        
+        for kind in ('snapshot', 'journal'):
+            for generation in self.generations(kind):
+                if generation < self.generation:
+                    try:
+                        os.remove(self.path(kind, generation))
+                    except OSError:
+                        pass  # still mapped on platforms that lock open files; removed next time
+    
+    def run(self, store):
+        self.ready.wait()
+        while True:
+            time.sleep(self.SNAPSHOT_INTERVAL)
+            if self.writes_since_snapshot:
+                self.take_snapshot(store)
+
 # In-memory storage for demo purposes
-issues_db = []
 users_db = []
 
 # Sample data for demonstration
@@ -70,8 +427,19 @@ sample_issues = [
     }
 ]
 
-# Initialize with sample data
-issues_db.extend(sample_issues)
+# Initialize with the persisted issues, or with sample data on first start
+if DEMO_DATA_DIR:
+    persistence = StorePersistence(DEMO_DATA_DIR, DEMO_SNAPSHOT_INTERVAL)
+    issues_db = persistence.open(sample_issues)
+    threading.Thread(target=persistence.run, args=(issues_db,), daemon=True).start()
+else:
+    persistence = None
+    issues_db = IssueStore()
+    issues_db.extend(sample_issues)
+
+# Open change feed connections: (queue, bounding box)
+change_subscribers = []
+change_subscribers_lock = threading.Lock()
 
 # HTML template for the demo interface
 HTML_TEMPLATE = """
@@ -208,16 +576,32 @@ HTML_TEMPLATE = """
             });
         }
 
+        const BBOX = 'minLat=12.8&maxLat=13.2&minLng=77.4&maxLng=77.8';
+        let issues = [];
+
         // Load and display issues
         function loadIssues() {
-            fetch('/api/issues/map?minLat=12.8&maxLat=13.2&minLng=77.4&maxLng=77.8')
+            fetch('/api/issues/map?' + BBOX)
                 .then(response => response.json())
                 .then(data => {
-                    displayIssues(data.issues);
-                    updateStats(data.issues);
+                    issues = data.issues;
+                    displayIssues(issues);
+                    updateStats(issues);
                 });
         }
 
+        // Apply issue changes pushed by the server instead of reloading the map
+        function subscribeToChanges() {
+            const changes = new EventSource('/api/issues/changes?' + BBOX);
+            changes.addEventListener('created', event => {
+                const issue = JSON.parse(event.data);
+                issues.unshift(issue);
+                addMarker(issue);
+                updateStats(issues);
+            });
+            changes.addEventListener('resync', loadIssues);
+        }
+
         function displayIssues(issues) {
             // Clear existing markers
             map.eachLayer(layer => {
@@ -227,24 +611,26 @@ HTML_TEMPLATE = """
             });
 
             // Add markers for each issue
-            issues.forEach(issue => {
-                const [lng, lat] = issue.location.coordinates;
-                const marker = L.marker([lat, lng], {
-                    icon: createIcon(issue.type, issue.severity)
-                }).addTo(map);
-
-                marker.bindPopup(`
-                    <div>
-                        <h6>${getTypeIcon(issue.type)} ${issue.type.replace('_', ' ')}</h6>
-                        <p><strong>Severity:</strong> <span class="severity-${issue.severity}">${issue.severity}</span></p>
-                        <p><strong>Status:</strong> ${issue.status.replace('_', ' ')}</p>
-                        <p><strong>Upvotes:</strong> ${issue.upvotes}</p>
-                        <p><strong>Priority:</strong> ${issue.priority}</p>
-                        <p><strong>Description:</strong> ${issue.description}</p>
-                        <p><strong>Address:</strong> ${issue.address}</p>
-                    </div>
-                `);
-            });
+            issues.forEach(addMarker);
+        }
+
+        function addMarker(issue) {
+            const [lng, lat] = issue.location.coordinates;
+            const marker = L.marker([lat, lng], {
+                icon: createIcon(issue.type, issue.severity)
+            }).addTo(map);
+
+            marker.bindPopup(`
+                <div>
+                    <h6>${getTypeIcon(issue.type)} ${issue.type.replace('_', ' ')}</h6>
+                    <p><strong>Severity:</strong> <span class="severity-${issue.severity}">${issue.severity}</span></p>
+                    <p><strong>Status:</strong> ${issue.status.replace('_', ' ')}</p>
+                    <p><strong>Upvotes:</strong> ${issue.upvotes}</p>
+                    <p><strong>Priority:</strong> ${issue.priority}</p>
+                    <p><strong>Description:</strong> ${issue.description}</p>
+                    <p><strong>Address:</strong> ${issue.address}</p>
+                </div>
+            `);
         }
 
         function updateStats(issues) {
@@ -304,7 +690,6 @@ HTML_TEMPLATE = """
                 if (data.success) {
                     alert('Issue reported successfully!');
                     document.getElementById('reportForm').reset();
-                    loadIssues();
                 } else {
                     alert('Error: ' + data.error);
                 }
@@ -313,6 +698,7 @@ HTML_TEMPLATE = """
 
         // Load initial data
         loadIssues();
+        subscribeToChanges();
     </script>
 </body>
 </html>
@@ -327,13 +713,22 @@ def report_issue():
     try:
         data = request.get_json()
         
+        try:
+            latitude = float(data.get('latitude'))
+            longitude = float(data.get('longitude'))
+        except (TypeError, ValueError):
+            return jsonify({
+                "success": False,
+                "error": "latitude and longitude must be numbers"
+            }), 400
+        
         # Create new issue
         new_issue = {
             "id": str(uuid.uuid4()),
             "type": data.get('type'),
             "location": {
                 "type": "Point",
-                "coordinates": [data.get('longitude'), data.get('latitude')]
+                "coordinates": [longitude, latitude]
             },
             "address": data.get('address'),
             "severity": data.get('severity'),
@@ -348,7 +743,11 @@ def report_issue():
             "updatedAt": datetime.now().isoformat()
         }
         
-        issues_db.append(new_issue)
+        if persistence:
+            persistence.append(issues_db, new_issue)
+        else:
+            issues_db.add(new_issue)
+        publish_change('created', new_issue)
         
         return jsonify({
             "success": True,
@@ -356,6 +755,11 @@ def report_issue():
             "issue": new_issue
         })
         
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             "success": False,
@@ -371,11 +775,7 @@ def get_issues_map():
         max_lng = float(request.args.get('maxLng', 77.8))
         
         # Filter issues within bounding box
-        filtered_issues = []
-        for issue in issues_db:
-            lng, lat = issue['location']['coordinates']
-            if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
-                filtered_issues.append(issue)
+        filtered_issues = issues_db.within_bbox(min_lat, max_lat, min_lng, max_lng)
         
         return jsonify({
             "success": True,
@@ -389,34 +789,40 @@ def get_issues_map():
             "error": str(e)
         }), 500
 
+@app.route('/api/issues/changes', methods=['GET'])
+def stream_issue_changes():
+    min_lat = float(request.args.get('minLat', 12.8))
+    max_lat = float(request.args.get('maxLat', 13.2))
+    min_lng = float(request.args.get('minLng', 77.4))
+    max_lng = float(request.args.get('maxLng', 77.8))
+    subscriber = (queue.Queue(), (min_lat, max_lat, min_lng, max_lng))
+    
+    with change_subscribers_lock:
+        change_subscribers.append(subscriber)
+    
+    def stream():
+        try:
+            while True:
+                try:
+                    yield subscriber[0].get(timeout=15)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+        finally:
+            with change_subscribers_lock:
+                change_subscribers.remove(subscriber)
+    
+    return app.response_class(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 @app.route('/api/issues/stats', methods=['GET'])
 def get_stats():
     try:
-        total_issues = len(issues_db)
-        avg_priority = sum(issue['priority'] for issue in issues_db) / total_issues if total_issues > 0 else 0
-        avg_upvotes = sum(issue['upvotes'] for issue in issues_db) / total_issues if total_issues > 0 else 0
-        
-        # Type breakdown
-        type_breakdown = {}
-        severity_breakdown = {}
-        status_breakdown = {}
-        
-        for issue in issues_db:
-            type_breakdown[issue['type']] = type_breakdown.get(issue['type'], 0) + 1
-            severity_breakdown[issue['severity']] = severity_breakdown.get(issue['severity'], 0) + 1
-            status_breakdown[issue['status']] = status_breakdown.get(issue['status'], 0) + 1
+        # Served from running aggregates instead of scanning every issue
+        stats = issues_db.stats()
+        stats["avgRepairTime"] = 7  # Demo value
         
         return jsonify({
             "success": True,
-            "stats": {
-                "totalIssues": total_issues,
-                "avgPriority": round(avg_priority, 1),
-                "avgUpvotes": round(avg_upvotes, 1),
-                "avgRepairTime": 7,  # Demo value
-                "typeBreakdown": type_breakdown,
-                "severityBreakdown": severity_breakdown,
-                "statusBreakdown": status_breakdown
-            }
+            "stats": stats
         })
         
     except Exception as e:
@@ -425,6 +831,16 @@ def get_stats():
             "error": str(e)
         }), 500
 
+def publish_change(change, issue):
+    """Send an issue change to every change feed subscriber watching its location"""
+    lng, lat = issue['location']['coordinates']
+    event = f"event: {change}\ndata: {json.dumps(issue)}\n\n"
+    
+    with change_subscribers_lock:
+        for events, (min_lat, max_lat, min_lng, max_lng) in change_subscribers:
+            if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
+                events.put(event)
+
 def calculate_priority(severity, upvotes, road_type):
     """Calculate priority score based on multiple factors"""
     severity_scores = {'low': 1, 'medium': 2, 'high': 3, 'critical': 5}
@@ -441,6 +857,8 @@ if __name__ == '__main__':
     print("📍 Server will be available at: http://localhost:5000")
     print("🗺️  Interactive map with sample data loaded")
     print("📱 Features: Report issues, view map, see statistics")
+    if persistence:
+        print(f"💾 Reports persisted to: {os.path.abspath(DEMO_DATA_DIR)}")
     print("🔄 Press Ctrl+C to stop the server")
     print("-" * 50)
     
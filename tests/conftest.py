@@ -0,0 +1,81 @@
+"""Shared fixtures: the Flask app on a throwaway SQLite database"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+
+# app.py reads its configuration and creates the upload folder at import time
+WORK_DIR = tempfile.mkdtemp(prefix='pothole-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(WORK_DIR, 'test.db')
+os.environ['PRIORITY_SCHEDULER_ENABLED'] = '0'
+os.environ.pop('RESPONSE_CACHE_PATH', None)
+os.chdir(WORK_DIR)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as backend  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_database():
+    """Start every test from empty tables and empty in-process caches"""
+    with backend.app.app_context():
+        backend.db.drop_all()
+        backend.db.create_all()
+        backend.spatial_index.setup()
+    backend.response_cache.entries.clear()
+    backend.response_cache.versions.clear()
+    backend.map_clusterer.cache.clear()
+    backend.tile_renderer.cache.clear()
+    yield
+
+
+@pytest.fixture
+def app_context():
+    with backend.app.app_context():
+        yield
+
+
+@pytest.fixture
+def client():
+    return backend.app.test_client()
+
+
+@pytest.fixture
+def make_user(app_context):
+    """Create users with unique names"""
+    created = []
+
+    def make_user():
+        user = backend.User(username=f'user{len(created)}', email=f'user{len(created)}@example.com')
+        backend.db.session.add(user)
+        backend.db.session.commit()
+        created.append(user)
+        return user
+    return make_user
+
+
+@pytest.fixture
+def make_issue(app_context, make_user):
+    """Create issues around MG Road, Bangalore, with overridable fields"""
+    reporter = make_user()
+
+    def make_issue(**fields):
+        values = {
+            'type': 'pothole',
+            'latitude': 12.9716,
+            'longitude': 77.5946,
+            'address': 'MG Road, Bangalore',
+            'severity': 'medium',
+            'description': 'Pothole near the signal',
+            'reporter_id': reporter.id,
+            'created_at': datetime.utcnow()
+        }
+        values.update(fields)
+        issue = backend.Issue(**values)
+        issue.base_priority = backend.priority_calculator.calculate_base_priority(issue)
+        backend.db.session.add(issue)
+        backend.db.session.commit()
+        return issue
+    return make_issue
@@ -0,0 +1,65 @@
+"""Demo server persistence: journals survive torn writes, snapshots round-trip"""
+import copy
+import os
+
+os.environ['DEMO_DATA_DIR'] = ''  # keep the import-time store in memory
+
+import demo_server
+
+
+def make_report(index):
+    return {
+        "id": f'report-{index}',
+        "type": "pothole",
+        "location": {"type": "Point", "coordinates": [77.5946 + index * 0.001, 12.9716]},
+        "address": "MG Road, Bangalore",
+        "description": f'Report {index}',
+        "severity": "medium",
+        "status": "reported",
+        "upvotes": index,
+        "priority": 50.0 + index
+    }
+
+
+def open_store(data_dir):
+    persistence = demo_server.StorePersistence(str(data_dir), 1000)
+    store = persistence.open([])
+    assert persistence.ready.wait(5)
+    return persistence, store
+
+
+def report_ids(store):
+    return [store.record(position)['id'] for position in range(len(store))]
+
+
+def test_reports_after_a_torn_tail_survive_the_next_restart(tmp_path):
+    persistence, store = open_store(tmp_path)
+    for index in range(3):
+        persistence.append(store, make_report(index))
+    # A crash halfway through the fourth record
+    persistence.journal.write(demo_server.StorePersistence.JOURNAL_RECORD.pack(200) + b'{"id": "torn')
+    persistence.journal.close()
+
+    persistence, store = open_store(tmp_path)
+    assert report_ids(store) == ['report-0', 'report-1', 'report-2']
+    for index in range(3, 6):
+        persistence.append(store, make_report(index))
+    persistence.journal.close()
+
+    persistence, store = open_store(tmp_path)
+    assert report_ids(store) == [f'report-{index}' for index in range(6)]
+    persistence.journal.close()
+
+
+def test_snapshot_round_trip_preserves_issues_and_aggregates(tmp_path):
+    store = demo_server.IssueStore()
+    reports = [make_report(index) for index in range(5)]
+    store.extend(copy.deepcopy(reports))
+    path = str(tmp_path / 'snapshot.1.bin')
+
+    store.write_snapshot(path, store.capture())
+    loaded = demo_server.IssueStore.load_snapshot(path)
+
+    assert [loaded.record(position) for position in range(len(loaded))] == reports
+    assert loaded.stats() == store.stats()
+    assert [issue['id'] for issue in loaded.within_bbox(12.97, 12.98, 77.594, 77.5960)] == ['report-0', 'report-1']
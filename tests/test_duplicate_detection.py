@@ -0,0 +1,83 @@
+"""Vectorized duplicate scoring must agree with the scalar reference implementation"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import backend
+
+# Largest relative gap between WGS84-scaled and spherical distances
+DISTANCE_TOLERANCE = 6e-3
+
+
+@pytest.fixture
+def candidates(make_issue):
+    now = datetime.utcnow()
+    return [
+        make_issue(latitude=12.9716, longitude=77.5946, severity='high', created_at=now),
+        make_issue(latitude=12.9719, longitude=77.5948, severity='medium', created_at=now - timedelta(days=2),
+                   description='Large pothole near the bus stop'),
+        make_issue(latitude=12.9712, longitude=77.5941, severity='high', created_at=now - timedelta(days=6),
+                   description=''),
+        make_issue(latitude=12.9725, longitude=77.5950, severity='low', created_at=now - timedelta(days=9)),
+        make_issue(latitude=-33.8688, longitude=151.2093, severity='high', created_at=now)
+    ]
+
+
+@pytest.mark.parametrize('report', [
+    {'latitude': 12.9716, 'longitude': 77.5946, 'severity': 'high', 'description': 'Pothole near the signal'},
+    {'latitude': 12.9718, 'longitude': 77.5944, 'severity': 'medium', 'description': 'large POTHOLE'},
+    {'latitude': -33.8690, 'longitude': 151.2090, 'severity': 'low', 'description': ''},
+])
+def test_vectorized_scores_match_scalar(candidates, report):
+    detector = backend.duplicate_detector
+
+    distances, similarities = detector.score_candidates(report, candidates)
+
+    for issue, distance, similarity in zip(candidates, distances, similarities):
+        expected_distance = detector.calculate_distance(
+            report['latitude'], report['longitude'], issue.latitude, issue.longitude
+        )
+        # The vectorized path scales by WGS84 meters per degree while haversine uses a
+        # sphere, and the shortcut only has to hold near the 50 m duplicate radius
+        if expected_distance <= 10 * detector.DISTANCE_THRESHOLD:
+            assert distance == pytest.approx(expected_distance, rel=DISTANCE_TOLERANCE)
+        assert similarity == pytest.approx(detector.calculate_similarity(report, issue, distance), abs=1e-6)
+        # Distance carries 40% of the score
+        assert similarity == pytest.approx(
+            detector.calculate_similarity(report, issue, expected_distance), abs=0.4 * DISTANCE_TOLERANCE
+        )
+
+
+def test_age_bonus_expression_matches_python(make_issue):
+    now = datetime.utcnow()
+    issues = [make_issue(created_at=now - timedelta(days=days, hours=1)) for days in (0, 1, 7, 19, 20, 45)]
+
+    computed = dict(backend.db.session.execute(
+        backend.db.select(backend.Issue.id, backend.priority_calculator.age_bonus_expression(backend.Issue.created_at))
+    ).all())
+
+    for issue in issues:
+        assert computed[issue.id] == pytest.approx(
+            backend.priority_calculator.calculate_age_bonus(issue.created_at)
+        )
+
+
+@pytest.mark.parametrize('photo_hash, bonus', [
+    ('0000000000000000', 0.0),
+    ('ffffffffffffffff', 0.0),
+    ('0f0f3c3c5a5a9696', backend.duplicate_detector.PHOTO_MATCH_BONUS),
+])
+def test_flat_photo_hashes_add_no_photo_signal(make_issue, photo_hash, bonus):
+    issue = make_issue(severity='low', created_at=datetime.utcnow() - timedelta(days=5))
+    photo = backend.Photo(issue_id=issue.id, filename='photo.jpg', file_path='uploads/photo.jpg', phash=photo_hash)
+    backend.db.session.add(photo)
+    backend.db.session.commit()
+    backend.photo_hash_index.add(photo.id, photo_hash)
+    backend.db.session.commit()
+    detector = backend.duplicate_detector
+    report = {'type': 'pothole', 'latitude': 12.9716, 'longitude': 77.5946, 'severity': 'high', 'description': ''}
+
+    without_photo, = detector.rank_candidates(report, detector.index_candidates([issue]))
+    with_photo, = detector.rank_candidates(dict(report, photo_hash=photo_hash), detector.index_candidates([issue]))
+
+    assert with_photo['similarity_score'] == pytest.approx(without_photo['similarity_score'] + bonus)
@@ -0,0 +1,44 @@
+"""geo_utils distances stay within their documented error against the WGS84 geodesic"""
+import math
+import random
+
+import pytest
+
+import geo_utils
+
+geodesic = pytest.importorskip('geopy.distance').geodesic
+
+
+@pytest.fixture(scope='module')
+def pairs():
+    """Point pairs 1-500 m apart between 60S and 60N, with their geodesic distance"""
+    rng = random.Random(7)
+    pairs = []
+    for _ in range(2000):
+        lat, lng = rng.uniform(-60, 60), rng.uniform(-180, 180)
+        distance, bearing = rng.uniform(1, 500), rng.uniform(0, 2 * math.pi)
+        meters_per_lat, meters_per_lng = geo_utils.meters_per_degree(lat)
+        other_lat = lat + distance * math.cos(bearing) / meters_per_lat
+        other_lng = lng + distance * math.sin(bearing) / meters_per_lng
+        pairs.append((lat, lng, other_lat, other_lng, geodesic((lat, lng), (other_lat, other_lng)).meters))
+    return pairs
+
+
+@pytest.mark.parametrize('function, tolerance', [
+    (geo_utils.haversine, 6e-3),
+    (geo_utils.equirectangular, 1.5e-4),
+])
+def test_distances_within_documented_error(pairs, function, tolerance):
+    worst = max(abs(function(*pair) - exact) / exact for *pair, exact in pairs)
+
+    assert worst <= tolerance
+
+
+def test_expand_bbox_contains_every_point_within_the_radius(pairs):
+    for lat, lng, other_lat, other_lng, exact in pairs:
+        # The box prefilters haversine, so it must hold for either distance
+        radius = max(exact, geo_utils.haversine(lat, lng, other_lat, other_lng))
+        min_lat, max_lat, min_lng, max_lng = geo_utils.expand_bbox(lat, lng, radius)
+
+        assert min_lat <= other_lat <= max_lat
+        assert min_lng <= other_lng <= max_lng
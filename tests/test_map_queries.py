@@ -0,0 +1,61 @@
+"""Map responses must load photos and upvoters in bulk, not per issue"""
+import pytest
+from sqlalchemy import event
+
+from conftest import backend
+
+
+def populate(make_issue, make_user, count):
+    voters = [make_user() for _ in range(3)]
+    for index in range(count):
+        issue = make_issue(latitude=12.97 + index * 0.0005, description=f'Pothole {index}')
+        for photo_index in range(2):
+            backend.db.session.add(backend.Photo(
+                issue_id=issue.id,
+                filename=f'{issue.id}-{photo_index}.jpg',
+                file_path=f'uploads/{issue.id}-{photo_index}.jpg'
+            ))
+        for voter in voters:
+            backend.db.session.execute(backend.issue_upvotes.insert().values(issue_id=issue.id, user_id=voter.id))
+    backend.db.session.commit()
+
+
+def count_queries(client, url):
+    """Run a request on a cold response cache and count the statements it sends"""
+    backend.response_cache.entries.clear()
+    statements = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = backend.db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+    assert response.status_code == 200
+    return response.get_json(), len(statements)
+
+
+@pytest.mark.parametrize('url', ['/api/issues/map', '/api/issues/map?view=marker'])
+def test_map_query_count_is_constant(client, make_issue, make_user, url):
+    populate(make_issue, make_user, 3)
+    few, few_queries = count_queries(client, url)
+
+    populate(make_issue, make_user, 30)
+    many, many_queries = count_queries(client, url)
+
+    assert (few['count'], many['count']) == (3, 33)
+    assert many_queries == few_queries
+
+
+def test_map_issues_include_bulk_loaded_relations(client, make_issue, make_user):
+    populate(make_issue, make_user, 4)
+
+    body, _ = count_queries(client, '/api/issues/map')
+
+    for issue in body['issues']:
+        assert len(issue['photos']) == 2
+        assert len(issue['upvoters']) == 3
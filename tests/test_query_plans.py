@@ -0,0 +1,93 @@
+"""EXPLAIN QUERY PLAN checks: the hot read paths must stay on indexes"""
+import pytest
+from sqlalchemy import event
+
+from conftest import backend
+
+HOT_TABLES = ('issues', 'issue_upvotes', 'photos', 'issue_stats_rollup')
+
+
+@pytest.fixture
+def captured_selects(app_context):
+    """Collect (statement, parameters) of every SELECT sent to the database"""
+    statements = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    engine = backend.db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', capture)
+
+
+def full_scans(statements):
+    """Return the plan lines that scan a hot table instead of searching an index"""
+    scans = []
+    with backend.db.engine.connect() as connection:
+        for statement, parameters in statements:
+            for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters):
+                detail = row[-1]
+                if any(detail.startswith(f'SCAN {table}') for table in HOT_TABLES):
+                    scans.append((detail, statement))
+    return scans
+
+
+@pytest.fixture
+def populated(make_issue):
+    for index in range(20):
+        make_issue(
+            latitude=12.96 + index * 0.002,
+            longitude=77.58 + index * 0.002,
+            type=['pothole', 'road_construction', 'road_closure'][index % 3],
+            status=['reported', 'verified'][index % 2]
+        )
+    return backend.User.query.first()
+
+
+@pytest.mark.parametrize('method, url', [
+    ('get', '/api/issues/map'),
+    ('get', '/api/issues/map?types=pothole&statuses=reported'),
+    ('get', '/api/issues/map?view=marker'),
+    ('get', '/api/issues/map?zoom=10'),
+    ('get', '/api/tiles/12/2930/1899'),
+    ('get', '/api/issues/stats'),
+])
+def test_read_endpoints_use_indexes(client, populated, captured_selects, method, url):
+    response = getattr(client, method)(url)
+
+    assert response.status_code == 200
+    assert captured_selects
+    assert full_scans(captured_selects) == []
+
+
+def test_duplicate_detection_uses_indexes(client, populated, captured_selects):
+    response = client.post('/api/issues/report', json={
+        'type': 'pothole',
+        'latitude': 12.9601,
+        'longitude': 77.5801,
+        'address': 'MG Road, Bangalore',
+        'description': 'Another pothole',
+        'severity': 'low',
+        'reporter_id': populated.id
+    })
+
+    assert response.status_code in (200, 201)
+    candidate_queries = [(statement, parameters) for statement, parameters in captured_selects
+                         if 'issues.created_at >=' in statement]
+    assert candidate_queries
+    assert full_scans(captured_selects) == []
+
+
+def test_upgrade_drops_the_base_priority_index(app_context):
+    backend.db.session.execute(backend.text('CREATE INDEX ix_issues_base_priority ON issues (base_priority)'))
+    backend.db.session.commit()
+
+    backend.upgrade_schema()
+
+    indexes = set(backend.db.session.execute(backend.text(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'issues'"
+    )).scalars())
+    assert 'ix_issues_base_priority' not in indexes
+    assert 'ix_issues_priority' in indexes
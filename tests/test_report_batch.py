@@ -0,0 +1,77 @@
+"""Batch reports: merges within the batch, per-report errors and all-or-nothing commits"""
+from conftest import backend
+
+
+def make_report(reporter_id, **fields):
+    report = {
+        'type': 'pothole', 'latitude': 12.9716, 'longitude': 77.5946, 'address': 'MG Road, Bangalore',
+        'description': 'Pothole near the signal', 'severity': 'medium', 'reporter_id': reporter_id
+    }
+    report.update(fields)
+    return report
+
+
+def issue_count():
+    return backend.db.session.query(backend.Issue).count()
+
+
+def test_later_report_merges_into_issue_created_by_the_same_batch(client, make_user):
+    reporter = make_user()
+
+    response = client.post('/api/issues/report/batch', json={'reports': [
+        make_report(reporter.id),
+        make_report(make_user().id)
+    ]})
+
+    body = response.get_json()
+    assert (body['created'], body['merged'], body['failed']) == (1, 1, 0)
+    created, merged = body['results']
+    assert merged['merged_with'] == created['issue']['id']
+
+    backend.db.session.expire_all()
+    assert issue_count() == 1
+    assert backend.db.session.get(backend.Issue, created['issue']['id']).upvotes == 1
+    assert backend.db.session.get(backend.User, reporter.id).reports_count == 1
+
+
+def test_invalid_reports_fail_alone(client, make_user):
+    reporter_id = make_user().id
+
+    response = client.post('/api/issues/report/batch', json=[
+        make_report(reporter_id),
+        make_report(reporter_id, description=''),
+        make_report(reporter_id, latitude='north'),
+        make_report(reporter_id, latitude=13.05, description='Another pothole')
+    ])
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert (body['created'], body['merged'], body['failed']) == (2, 0, 2)
+    assert [result['success'] for result in body['results']] == [True, False, False, True]
+    assert body['results'][1]['error'] == 'Missing required field: description'
+    assert body['results'][2]['error'].startswith('Invalid latitude')
+    assert issue_count() == 2
+
+
+def test_failed_commit_rolls_back_the_whole_batch(client, make_issue, make_user, monkeypatch):
+    existing = make_issue()
+    existing_id = existing.id
+    reporter_id = make_user().id
+
+    def failing_commit():
+        raise RuntimeError('disk I/O error')
+    monkeypatch.setattr(backend.db.session, 'commit', failing_commit)
+
+    response = client.post('/api/issues/report/batch', json=[
+        make_report(reporter_id),
+        make_report(reporter_id, latitude=13.05, description='Another pothole')
+    ])
+    monkeypatch.undo()
+
+    assert response.status_code == 500
+    assert response.get_json()['error'] == 'disk I/O error'
+    backend.db.session.expire_all()
+    assert issue_count() == 1
+    assert backend.db.session.get(backend.Issue, existing_id).upvotes == 0
+    assert backend.db.session.get(backend.User, reporter_id).reports_count == 0
+    assert backend.db.session.query(backend.IssueStatsRollup).count() == 0
@@ -0,0 +1,32 @@
+"""Cached responses expire with the TTL even when no write bumps their versions"""
+from datetime import datetime
+
+from conftest import backend
+
+
+def test_etag_rolls_over_with_the_ttl_bucket(client, make_issue, monkeypatch):
+    make_issue()
+    ttl = backend.response_cache.TTL
+    now = 1_700_000_000 - 1_700_000_000 % ttl
+    monkeypatch.setattr(backend.time, 'time', lambda: now)
+
+    first = client.get('/api/issues/map')
+    again = client.get('/api/issues/map', headers={'If-None-Match': first.headers['ETag']})
+    monkeypatch.setattr(backend.time, 'time', lambda: now + ttl)
+    expired = client.get('/api/issues/map', headers={'If-None-Match': first.headers['ETag']})
+
+    assert again.status_code == 304
+    assert expired.status_code == 200
+    assert expired.headers['ETag'] != first.headers['ETag']
+    assert expired.last_modified.timestamp() >= now + ttl
+
+
+def test_stats_are_cached_per_utc_day(client, make_issue):
+    make_issue()
+
+    response = client.get('/api/issues/stats?timeRange=7')
+
+    assert response.status_code == 200
+    assert list(backend.response_cache.entries) == [
+        '/api/issues/stats?timeRange=7#' + datetime.utcnow().date().isoformat()
+    ]
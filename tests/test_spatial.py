@@ -0,0 +1,105 @@
+"""Both spatial strategies: bbox end to end on SQLite, PostGIS against stand-ins"""
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from conftest import backend
+
+
+@pytest.fixture
+def strategy(request):
+    """Swap the active spatial strategy for one test"""
+    previous = backend.spatial_index.strategy
+    backend.spatial_index.strategy = request.param
+    yield request.param
+    backend.spatial_index.strategy = previous
+
+
+def compile_postgresql(conditions):
+    statement = backend.db.select(backend.Issue.id).where(*conditions)
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+
+
+class RecordingConnection:
+    """Stand-in connection that records SQL and answers pg_extension lookups"""
+
+    def __init__(self, installed_extensions=()):
+        self.installed_extensions = set(installed_extensions)
+        self.statements = []
+
+    def execute(self, statement):
+        sql = str(statement)
+        self.statements.append(sql)
+        found = 'pg_extension' in sql and 'postgis' in self.installed_extensions
+        return SimpleNamespace(first=lambda: (1,) if found else None)
+
+
+class StandInEngine:
+    def __init__(self, dialect_name, connection):
+        self.dialect = SimpleNamespace(name=dialect_name)
+        self.connection = connection
+
+    @contextmanager
+    def connect(self):
+        yield self.connection
+
+
+@pytest.mark.parametrize('strategy', [backend.BBoxSpatialStrategy()], indirect=True)
+def test_bbox_strategy_filters_map_and_duplicates(client, make_issue, strategy):
+    inside = make_issue(latitude=12.9716, longitude=77.5946)
+    make_issue(latitude=12.9900, longitude=77.5946)
+    reporter_id = inside.reporter_id
+
+    response = client.get('/api/issues/map?minLat=12.97&maxLat=12.98&minLng=77.59&maxLng=77.60')
+    assert [issue['id'] for issue in response.get_json()['issues']] == [inside.id]
+
+    candidates = backend.duplicate_detector.fetch_candidates([{
+        'type': 'pothole', 'latitude': 12.97162, 'longitude': 77.59462, 'reporter_id': reporter_id
+    }])
+    assert [issue.id for issue in candidates] == [inside.id]
+
+
+def test_postgis_strategy_uses_the_geometry_column():
+    strategy = backend.PostGISSpatialStrategy()
+
+    bbox_sql = compile_postgresql(strategy.within_bbox(12.9, 13.0, 77.5, 77.6))
+    near_sql = compile_postgresql(strategy.near_any([(12.97, 77.59), (12.98, 77.60)], 50))
+
+    assert 'issues.geom && ST_MakeEnvelope(77.5, 12.9, 77.6, 13.0, 4326)' in bbox_sql
+    assert 'latitude' not in bbox_sql.split('WHERE', 1)[1]
+    assert near_sql.count('ST_DWithin(geography(issues.geom)') == 2
+    assert ', 50)' in near_sql
+
+
+def test_postgis_setup_creates_generated_column_and_gist_index():
+    connection = RecordingConnection()
+
+    backend.PostGISSpatialStrategy().setup(connection)
+
+    assert connection.statements[0] == 'CREATE EXTENSION IF NOT EXISTS postgis'
+    assert 'GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)) STORED' in connection.statements[1]
+    assert 'USING GIST (geom)' in connection.statements[2]
+
+
+@pytest.mark.parametrize('dialect_name, installed, expected', [
+    ('sqlite', (), 'bbox'),
+    ('postgresql', (), 'bbox'),
+    ('postgresql', ('postgis',), 'postgis'),
+])
+def test_auto_backend_requires_an_installed_extension(dialect_name, installed, expected):
+    connection = RecordingConnection(installed)
+
+    chosen = backend.SpatialIndex('auto').choose_strategy(StandInEngine(dialect_name, connection))
+
+    assert chosen.name == expected
+    if dialect_name == 'postgresql':
+        assert 'pg_extension' in connection.statements[0]
+
+
+@pytest.mark.parametrize('configured', ['bbox', 'postgis'])
+def test_explicit_backend_skips_detection(configured):
+    chosen = backend.SpatialIndex(configured).choose_strategy(StandInEngine('postgresql', None))
+
+    assert chosen.name == configured
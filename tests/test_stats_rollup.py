@@ -0,0 +1,96 @@
+"""The stats rollup must agree with a full scan of the issues table after every kind of write"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import backend
+
+TIME_RANGE = timedelta(days=30)
+
+
+def full_scan_stats(time_threshold, ward=None):
+    """Statistics computed from every matching issue row, the way the endpoint used to"""
+    query = backend.Issue.query.filter(backend.Issue.created_at >= time_threshold)
+    if ward:
+        query = query.filter(backend.Issue.ward == ward)
+    issues = query.all()
+    total = len(issues)
+
+    def breakdown(field):
+        counts = {}
+        for issue in issues:
+            counts[getattr(issue, field)] = counts.get(getattr(issue, field), 0) + 1
+        return counts
+
+    return {
+        'totalIssues': total,
+        'avgPriority': round(sum(issue.base_priority + issue.age_bonus for issue in issues) / total, 1),
+        'avgUpvotes': round(sum(issue.upvotes for issue in issues) / total, 1),
+        'avgRepairTime': round(sum(issue.estimated_repair_time or 0 for issue in issues) / total, 1),
+        'typeBreakdown': breakdown('type'),
+        'severityBreakdown': breakdown('severity'),
+        'statusBreakdown': breakdown('status')
+    }
+
+
+def assert_parity(ward=None):
+    backend.db.session.expire_all()
+    time_threshold = datetime.utcnow() - TIME_RANGE
+    assert backend.stats_rollup.summarize(time_threshold, ward) == full_scan_stats(time_threshold, ward)
+
+
+@pytest.fixture
+def seeded(make_issue):
+    """Issues of several ages and wards, with the rollup and age bonuses brought up to date"""
+    now = datetime.utcnow()
+    issues = [
+        make_issue(created_at=now - timedelta(days=days), ward=ward, severity=severity, type=issue_type,
+                   latitude=12.9716 + index * 0.01)
+        for index, (days, ward, severity, issue_type) in enumerate([
+            (0, 'Shivajinagar', 'high', 'pothole'),
+            (3, 'Shivajinagar', 'medium', 'road_construction'),
+            (12, 'Jayanagar', 'low', 'pothole'),
+            (25, 'Jayanagar', 'critical', 'road_closure'),
+            (45, 'Jayanagar', 'high', 'pothole')
+        ])
+    ]
+    backend.stats_rollup.rebuild()
+    backend.db.session.commit()
+    backend.priority_scheduler.refresh(full=True)
+    return issues
+
+
+def test_rollup_matches_full_scan_after_each_write(client, make_user, seeded, monkeypatch):
+    assert_parity()
+    reporter_id = make_user().id
+
+    report = {
+        'type': 'pothole', 'latitude': 13.1, 'longitude': 77.5946, 'address': 'Hebbal, Bangalore',
+        'description': 'Deep pothole on the flyover ramp', 'severity': 'medium', 'ward': 'Hebbal',
+        'reporter_id': reporter_id
+    }
+    created = client.post('/api/issues/report', json=report)
+    assert created.status_code == 201
+    assert_parity()
+    assert_parity('Hebbal')
+
+    merged = client.post('/api/issues/report', json=dict(report, reporter_id=make_user().id))
+    assert merged.get_json()['is_duplicate']
+    assert_parity()
+
+    upvoted = client.post(f'/api/issues/{seeded[1].id}/upvote', json={'userId': reporter_id})
+    backend.upvote_buffer.flush()
+    assert upvoted.status_code == 200
+    assert_parity('Shivajinagar')
+
+    updated = client.patch(f'/api/issues/{seeded[2].id}/status',
+                           json={'status': 'repair_scheduled', 'estimatedRepairTime': 48})
+    assert updated.status_code == 200
+    assert_parity()
+    assert_parity('Jayanagar')
+
+    # A full run after a weight change rewrites base priorities under the rollup
+    monkeypatch.setattr(backend.priority_calculator, 'UPVOTE_WEIGHT', 2.0)
+    backend.priority_scheduler.refresh(full=True)
+    assert_parity()
+    assert_parity('Shivajinagar')
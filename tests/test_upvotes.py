@@ -0,0 +1,54 @@
+"""Concurrent upvotes must be counted exactly once per user"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import backend
+
+VOTERS = 16
+
+
+@pytest.fixture(params=[False, True], ids=['direct', 'buffered'])
+def buffered(request):
+    enabled = backend.upvote_buffer.enabled
+    backend.upvote_buffer.enabled = request.param
+    yield request.param
+    backend.upvote_buffer.flush()
+    backend.upvote_buffer.enabled = enabled
+
+
+def test_parallel_upvotes_have_exact_counts(make_issue, make_user, buffered):
+    issue = make_issue()
+    issue_id, base_priority = issue.id, issue.base_priority
+    voters = [make_user().id for _ in range(VOTERS)]
+
+    def upvote(user_id):
+        # Each request gets its own client, like separate browsers
+        response = backend.app.test_client().post(f'/api/issues/{issue_id}/upvote', json={'userId': user_id})
+        return response.status_code
+
+    # Every voter tries twice, all at once
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(upvote, voters * 2))
+    backend.upvote_buffer.flush()
+
+    assert statuses.count(200) == VOTERS
+    assert statuses.count(400) == VOTERS
+
+    backend.db.session.expire_all()
+    issue = backend.db.session.get(backend.Issue, issue_id)
+    assert issue.upvotes == VOTERS
+    assert issue.base_priority == pytest.approx(base_priority + VOTERS * backend.priority_calculator.UPVOTE_WEIGHT)
+    assert backend.db.session.query(backend.issue_upvotes).filter_by(issue_id=issue_id).count() == VOTERS
+    assert all(backend.db.session.get(backend.User, user_id).upvotes_given == 1 for user_id in voters)
+
+
+def test_unknown_user_is_not_counted(client, make_issue, buffered):
+    issue = make_issue()
+
+    response = client.post(f'/api/issues/{issue.id}/upvote', json={'userId': 'no-such-user'})
+    backend.upvote_buffer.flush()
+
+    assert response.status_code == 200
+    backend.db.session.expire_all()
+    assert backend.db.session.get(backend.Issue, issue.id).upvotes == 0
@@ -0,0 +1,116 @@
+"""Work queue heaps: re-prioritisation, removal, ordered reads and change feed upkeep"""
+import itertools
+import random
+import time
+
+import pytest
+
+from conftest import backend
+
+ORIGIN = (12.9716, 77.5946)
+
+
+def assert_heap_valid(heap):
+    for position, (priority, item) in enumerate(heap.entries):
+        assert heap.positions[item] == position
+        if position:
+            assert priority <= heap.entries[(position - 1) // 2][0]
+    assert len(heap.positions) == len(heap.entries)
+
+
+def make_heap(priorities):
+    heap = backend.IndexedHeap()
+    for item, priority in priorities.items():
+        heap.push(item, priority)
+    return heap
+
+
+def test_remove_inner_node_keeps_heap_valid():
+    priorities = {f'issue-{index}': float(index) for index in range(15)}
+    heap = make_heap(priorities)
+    inner = heap.entries[1][1]
+
+    heap.remove(inner)
+    heap.remove('not-queued')
+
+    assert_heap_valid(heap)
+    del priorities[inner]
+    assert [item for _, item in heap.ordered()] == sorted(priorities, key=priorities.get, reverse=True)
+
+
+@pytest.mark.parametrize('new_priority', [100.0, -1.0], ids=['up', 'down'])
+def test_reprioritise_moves_item(new_priority):
+    priorities = {f'issue-{index}': float(index) for index in range(15)}
+    heap = make_heap(priorities)
+
+    heap.push('issue-7', new_priority)
+
+    assert_heap_valid(heap)
+    assert len(heap) == 15
+    ordered = [item for _, item in heap.ordered()]
+    assert ordered[0 if new_priority > 14 else -1] == 'issue-7'
+
+
+def test_ordered_yields_descending_priorities_lazily():
+    rng = random.Random(7)
+    heap = make_heap({f'issue-{index}': rng.uniform(0, 100) for index in range(200)})
+    for index in range(0, 200, 3):
+        heap.remove(f'issue-{index}')
+    for index in range(1, 200, 5):
+        heap.push(f'issue-{index}', rng.uniform(0, 100))
+    assert_heap_valid(heap)
+
+    priorities = [priority for priority, _ in heap.ordered()]
+    assert priorities == sorted((priority for priority, _ in heap.entries), reverse=True)
+    assert [priority for priority, _ in itertools.islice(heap.ordered(), 3)] == priorities[:3]
+
+
+def make_queue(jobs):
+    """A queue over (issue id, meters north of ORIGIN, priority) without a database load"""
+    queue = backend.WorkQueue(0.001, 300, 300)
+    meters_per_degree = backend.geo_utils.haversine(0, 0, 1, 0)
+    for issue_id, meters_north, priority in jobs:
+        queue.upsert(issue_id, ORIGIN[0] + meters_north / meters_per_degree, ORIGIN[1], priority)
+    queue.loaded_at = time.monotonic()
+    return queue
+
+
+def test_nearest_jobs_merges_regions_by_priority():
+    queue = make_queue([('a', 100, 10.0), ('b', 200, 50.0), ('c', 300, 30.0), ('d', 400, 70.0)])
+
+    jobs = queue.nearest_jobs(*ORIGIN, 500, 10)
+
+    assert len(queue.regions) == 4
+    assert [issue_id for issue_id, _, _ in jobs] == ['d', 'b', 'c', 'a']
+
+
+def test_nearest_jobs_applies_radius_and_limit():
+    queue = make_queue([('near', 100, 10.0), ('mid', 250, 30.0), ('far', 2000, 90.0)])
+
+    within_radius = queue.nearest_jobs(*ORIGIN, 500, 10)
+    limited = queue.nearest_jobs(*ORIGIN, 500, 1)
+
+    assert [issue_id for issue_id, _, _ in within_radius] == ['mid', 'near']
+    assert all(distance <= 500 for _, _, distance in within_radius)
+    assert [issue_id for issue_id, _, _ in limited] == ['mid']
+
+
+@pytest.fixture
+def loaded_queue(app_context):
+    backend.work_queue.loaded_at = None
+    yield backend.work_queue
+    backend.work_queue.loaded_at = None
+
+
+def test_change_feed_closes_and_reopens_jobs(client, make_issue, loaded_queue):
+    issue = make_issue()
+    loaded_queue.load()
+    assert issue.id in loaded_queue.locations
+
+    client.patch(f'/api/issues/{issue.id}/status', json={'status': 'fixed'})
+    assert issue.id not in loaded_queue.locations
+
+    client.patch(f'/api/issues/{issue.id}/status', json={'status': 'verified'})
+    assert issue.id in loaded_queue.locations
+    jobs = loaded_queue.nearest_jobs(issue.latitude, issue.longitude, 100, 10)
+    assert [issue_id for issue_id, _, _ in jobs] == [issue.id]